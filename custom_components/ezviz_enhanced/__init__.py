@@ -7,9 +7,16 @@ from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .const import DOMAIN, CONF_APP_KEY, CONF_APP_SECRET
+from .const import (
+    DOMAIN, CONF_APP_KEY, CONF_APP_SECRET, CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA,
+    CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS, CONF_EXTRA_APP_KEYS,
+)
 from .coordinator import EzvizDataUpdateCoordinator
-from .api import EzvizApi, EzvizOpenApi
+from .api import EzvizApi
+from .keypool import AppKeyPool, parse_app_keys
+from .registry import get_client_registry
+from .services import async_setup_services, async_unload_services
+from .webrtc import async_setup_webrtc_provider, async_unload_webrtc_provider
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,29 +34,60 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     
     # Initialize EZVIZ Open Platform API if credentials provided
+    # (un seul client par clé d'application, partagé entre les entrées)
     ezviz_open_api = None
+    api_pool = None
+    clients = []
     if CONF_APP_KEY in entry.data and CONF_APP_SECRET in entry.data:
-        ezviz_open_api = EzvizOpenApi(
-            app_key=entry.data[CONF_APP_KEY],
-            app_secret=entry.data[CONF_APP_SECRET],
+        registry = get_client_registry(hass)
+        client_options = {
+            "daily_quota": entry.data.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA),
+            "hedge_requests": entry.data.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS),
+        }
+        ezviz_open_api = await registry.async_acquire(
+            entry.data[CONF_APP_KEY], entry.data[CONF_APP_SECRET], **client_options
         )
+        clients.append(ezviz_open_api)
+        
+        # Clés supplémentaires : chaque clé garde son token et son limiteur
+        for app_key, app_secret in parse_app_keys(entry.data.get(CONF_EXTRA_APP_KEYS, "")):
+            if app_key == entry.data[CONF_APP_KEY]:
+                continue
+            clients.append(await registry.async_acquire(app_key, app_secret, **client_options))
+        if len(clients) > 1:
+            api_pool = AppKeyPool(clients)
+            _LOGGER.info(f"🔑 EZVIZ Enhanced: {len(clients)} clés d'application en pool")
     
     # Initialize coordinator
     coordinator = EzvizDataUpdateCoordinator(
-        hass, ezviz_api, ezviz_open_api, entry.data
+        hass, ezviz_api, ezviz_open_api, entry.data, api_pool
     )
 
     # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
 
-    if not coordinator.last_update_success:
-        raise ConfigEntryNotReady
+        if not coordinator.last_update_success:
+            raise ConfigEntryNotReady
+    except Exception:
+        for client in clients:
+            await get_client_registry(hass).async_release(client)
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Le composant camera est chargé par la plateforme : le fournisseur WebRTC peut s'inscrire
+    async_setup_webrtc_provider(hass)
+
+    # Après les plateformes : les capteurs de mouvement écoutent dès la première alarme
+    if coordinator.alarm_ingestor:
+        await coordinator.alarm_ingestor.async_start()
+
+    await async_setup_services(hass)
+
     return True
 
 
@@ -58,6 +96,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_release_resources()
+        clients = coordinator.api_pool.clients if coordinator.api_pool else [coordinator.ezviz_open_api]
+        for client in clients:
+            if client:
+                await get_client_registry(hass).async_release(client)
+        await async_unload_services(hass)
+        async_unload_webrtc_provider(hass)
 
     return unload_ok
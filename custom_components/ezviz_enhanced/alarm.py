@@ -0,0 +1,229 @@
+"""Incremental alarm ingestion for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN, EVENT_ALARM, DEFAULT_ALARM_INTERVAL, DEFAULT_ALARM_PAGE_SIZE, DEFAULT_ALARM_MAX_PAGES,
+)
+from .models import camera_key
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}_alarms"  # Un fichier par compte : {STORAGE_KEY}_{clé d'application}
+
+CURSOR_OVERLAP = 120000  # Fenêtre relue avant le curseur (ms), pour les alarmes indexées en retard
+MAX_REPLAY = 600000  # Fenêtre relue au plus après une interruption (ms)
+SEEN_IDS_MAX = 1000  # Identifiants retenus pour la déduplication
+SAVE_DELAY = 10  # Écriture groupée du curseur (secondes)
+
+
+class AlarmEvent:
+    """One alarm message of a camera channel."""
+
+    __slots__ = ("alarm_id", "key", "serial", "channel", "alarm_type", "name", "alarm_time", "picture_url")
+
+    def __init__(self, alarm: Dict[str, Any]):
+        """Initialize from an alarm/list item."""
+        self.alarm_id = str(alarm["alarmId"])
+        self.serial = alarm.get("deviceSerial")
+        try:
+            self.channel = int(alarm.get("channelNo") or 1)
+        except (TypeError, ValueError):
+            self.channel = 1
+        self.key = camera_key(self.serial, self.channel)
+        self.alarm_type = alarm.get("alarmType")
+        self.name = alarm.get("alarmName")
+        self.alarm_time = int(alarm.get("alarmTime") or 0)
+        self.picture_url = alarm.get("alarmPicUrl")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the event as a dictionary (bus events)."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class AlarmIngestor:
+    """Poll alarm/list for every device with a persisted high-water mark and deduplication."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client_getter: Callable,
+        account: str,
+        interval: float = DEFAULT_ALARM_INTERVAL,
+        page_size: int = DEFAULT_ALARM_PAGE_SIZE,
+        max_pages: int = DEFAULT_ALARM_MAX_PAGES,
+    ):
+        """Initialize alarm ingestor."""
+        self.hass = hass
+        # Client choisi à chaque cycle (débordement du pool de clés)
+        self._client_getter = client_getter
+        self.account = account
+        self.interval = interval
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.cursor: Optional[int] = None  # alarmTime le plus récent ingéré (ms)
+        self.last_events: Dict[str, AlarmEvent] = {}
+        self.ingested = 0
+        self.duplicates = 0
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._listeners: Dict[str, List[CALLBACK_TYPE]] = {}
+        self._store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}_{account}")
+        self._lock = asyncio.Lock()
+        self._remove_timer: Optional[CALLBACK_TYPE] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    @property
+    def replay_age(self) -> float:
+        """Return the age (seconds) past which an alarm can only come from a replayed window."""
+        # Retard d'indexation couvert par le recouvrement, plus un intervalle de polling
+        return self.interval + CURSOR_OVERLAP / 1000
+
+    @callback
+    def async_add_listener(self, key: str, update_callback: Callable[[AlarmEvent], None]) -> Callable[[], None]:
+        """Listen for the new alarms of one camera."""
+        listeners = self._listeners.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the alarm listener."""
+            listeners.remove(update_callback)
+            if not listeners:
+                self._listeners.pop(key, None)
+
+        return remove_listener
+
+    async def async_start(self):
+        """Load the cursor and start polling."""
+        state = await self._store.async_load() or {}
+        self.cursor = state.get("cursor")
+        self._seen.update(state.get("seen", {}))
+
+        self._remove_timer = async_track_time_interval(
+            self.hass, self._async_tick, timedelta(seconds=self.interval)
+        )
+        self._async_tick()
+
+    async def async_stop(self):
+        """Stop polling, wait for the running poll and write the cursor."""
+        if self._remove_timer:
+            self._remove_timer()
+            self._remove_timer = None
+        # Le client peut être fermé juste après : ne pas laisser un cycle en vol
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        if self.cursor is not None:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_tick(self, _now=None):
+        """Start one poll unless the previous one is still running."""
+        if self._poll_task is not None and not self._poll_task.done():
+            return
+        self._poll_task = self.hass.async_create_background_task(
+            self.async_poll(), f"{DOMAIN}_alarms_{self.account}"
+        )
+
+    async def async_poll(self) -> int:
+        """Fetch the alarms newer than the cursor, dispatch them and return how many were new."""
+        async with self._lock:
+            end_time = int(time.time() * 1000)
+            if self.cursor is None:
+                # Premier démarrage : pas de rejeu de l'historique
+                start_time = end_time - int(self.interval * 1000)
+            else:
+                # Après une interruption, seules les dernières minutes sont relues
+                start_time = max(self.cursor - CURSOR_OVERLAP, end_time - MAX_REPLAY)
+
+            alarms = await self._async_fetch(start_time, end_time)
+            if alarms is None:
+                # Page manquante : curseur inchangé, la fenêtre est relue au prochain cycle
+                return 0
+
+            events = []
+            for alarm in alarms:
+                if not alarm.get("alarmId") or not alarm.get("deviceSerial"):
+                    continue
+                event = AlarmEvent(alarm)
+                if event.alarm_id in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._remember(event)
+                events.append(event)
+
+            # Curseur à l'alarme la plus récente ingérée (horloge locale en plafond si une caméra avance)
+            newest = max((e.alarm_time for e in events), default=start_time)
+            self.cursor = max(self.cursor or start_time, min(newest, end_time))
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+            events.sort(key=lambda e: e.alarm_time)
+            for event in events:
+                self._dispatch(event)
+            self.ingested += len(events)
+            return len(events)
+
+    async def _async_fetch(self, start_time: int, end_time: int) -> Optional[List[Dict[str, Any]]]:
+        """Return every alarm of the window, None if a page is missing."""
+        client = self._client_getter()
+        alarms, total = await client.async_get_alarm_page(start_time, end_time, 0, self.page_size)
+        if alarms is None:
+            return None
+
+        pages = math.ceil(total / self.page_size) if total else 1
+        if pages > self.max_pages:
+            # Rafale : les alarmes les plus récentes d'abord, les plus anciennes sont abandonnées
+            _LOGGER.warning(
+                f"⚠️ EZVIZ Enhanced: {total} alarmes en attente, seules les {self.max_pages * self.page_size} "
+                "plus récentes sont lues"
+            )
+            pages = self.max_pages
+        if pages <= 1:
+            return alarms
+
+        # Fenêtre fermée (endTime fixe) : les pages restent stables, lecture concurrente
+        results = await asyncio.gather(
+            *(client.async_get_alarm_page(start_time, end_time, page, self.page_size) for page in range(1, pages))
+        )
+        for page_alarms, _total in results:
+            if page_alarms is None:
+                return None
+            alarms.extend(page_alarms)
+        return alarms
+
+    def _remember(self, event: AlarmEvent):
+        """Record an alarm id, forgetting the oldest ones."""
+        self._seen[event.alarm_id] = event.alarm_time
+        while len(self._seen) > SEEN_IDS_MAX:
+            self._seen.popitem(last=False)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the cursor and the ids still needed for deduplication."""
+        # Seuls les identifiants de la fenêtre relue servent encore après un redémarrage
+        floor = (self.cursor or 0) - CURSOR_OVERLAP
+        return {
+            "cursor": self.cursor,
+            "seen": {alarm_id: alarm_time for alarm_id, alarm_time in self._seen.items() if alarm_time >= floor},
+        }
+
+    @callback
+    def _dispatch(self, event: AlarmEvent):
+        """Push an alarm to its camera listeners and the event bus."""
+        self.last_events[event.key] = event
+        self.hass.bus.async_fire(EVENT_ALARM, event.as_dict())
+        for update_callback in list(self._listeners.get(event.key, [])):
+            update_callback(event)
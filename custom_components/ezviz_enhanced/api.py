@@ -3,17 +3,78 @@ import logging
 import aiohttp
 import asyncio
 import json
-from typing import Dict, List, Optional, Any
-from urllib.parse import urlencode
+import math
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlencode, urlparse
 
 from .const import (
     EZVIZ_OPEN_BASE_URL, EZVIZ_OPEN_API_BASE, EZVIZ_OPEN_AUTH_URL, EZVIZ_OPEN_DEVICE_URL, 
-    EZVIZ_OPEN_LIVE_URL, EZVIZ_OPEN_CAPABILITY_URL, EZVIZ_OPEN_LIVE_CONSOLE_URL,
-    EZVIZ_API_BASE, EZVIZ_AUTH_URL, EZVIZ_DEVICE_URL
+    EZVIZ_OPEN_LIVE_URL, EZVIZ_OPEN_LIVE_LIST_URL, EZVIZ_OPEN_CAPABILITY_URL, EZVIZ_OPEN_LIVE_CONSOLE_URL,
+    EZVIZ_OPEN_ALARM_URL,
+    EZVIZ_API_BASE, EZVIZ_AUTH_URL, EZVIZ_DEVICE_URL,
+    DEFAULT_DAILY_QUOTA, DEFAULT_API_RATE, DEFAULT_API_BURST, DEFAULT_LIVE_RATE, DEFAULT_LIVE_BURST,
+    DEFAULT_HEDGE_REQUESTS, DEFAULT_HEDGE_PERCENTILE, DEFAULT_HEDGE_MIN_SAMPLES,
+)
+from .region import RegionSelector
+from .ratelimit import RateLimiter, QuotaExceeded, PRIORITY_BACKGROUND, INTERACTIVE_RESERVE
+from .resilience import (
+    CircuitBreaker, CircuitOpenError, LatencyTracker, classify_response, backoff_delay,
+    ERROR_NONE, ERROR_AUTH, ERROR_PERMANENT, ERROR_RATE_LIMIT, ERROR_RETRYABLE, MAX_ATTEMPTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Try to get HLS Fluent (sub-bitrate) first as it's more stable
+PROTOCOLS_TO_TRY = [
+    {"protocol": "2", "quality": "2", "name": "hls_fluent"},  # HLS Fluent
+    {"protocol": "2", "quality": "1", "name": "hls_hd"},      # HLS HD
+    {"protocol": "4", "quality": "2", "name": "flv_fluent"},  # FLV Fluent
+    {"protocol": "4", "quality": "1", "name": "flv_hd"},      # FLV HD
+]
+
+
+# Délai maximum par endpoint (secondes), session.post n'en a pas par défaut
+DEFAULT_DEADLINE = 15
+ENDPOINT_DEADLINES = {
+    urlparse(EZVIZ_OPEN_AUTH_URL).path: 10,
+    urlparse(EZVIZ_OPEN_DEVICE_URL).path: 15,
+    urlparse(EZVIZ_OPEN_LIVE_URL).path: 8,
+    urlparse(EZVIZ_OPEN_LIVE_LIST_URL).path: 10,
+    urlparse(EZVIZ_OPEN_ALARM_URL).path: 10,
+}
+
+THROTTLE_COOLDOWN = 60  # Durée pendant laquelle une clé limitée par la plateforme est évitée
+BAD_VARIANT_COOLDOWN = 600  # Variante écartée après un échec de validation de la playlist
+
+# Liste multi-adresses : tout le compte, lue une fois par cycle et partagée entre appareils
+LIVE_LIST_PAGE_SIZE = 50  # Maximum accepté par live/video/list
+LIVE_LIST_MAX_PAGES = 20
+LIVE_LIST_MAX_AGE = 10  # Durée de vie de l'instantané (secondes), plus courte qu'un cycle
+LIVE_LIST_UNSUPPORTED_CODES = {"10031"}  # Compte sans droit sur la liste multi-adresses
+
+# Endpoints idempotents pouvant être dupliqués
+HEDGED_ENDPOINTS = {urlparse(EZVIZ_OPEN_LIVE_URL).path}
+
+
+def _build_stream_info(
+    serial: str, channel: int, protocol_config: Dict[str, str], url: str, expire_time: Any
+) -> Dict[str, Any]:
+    """Build the stream information returned for a live address."""
+    return {
+        "serial": serial,
+        "channel": channel,
+        "status": "online",
+        "stream_type": protocol_config["name"],
+        "hls_url": url if "hls" in protocol_config["name"] else None,
+        "flv_url": url if "flv" in protocol_config["name"] else None,
+        "rtsp_url": None,  # Will be generated by converter
+        "cloud_url": url,
+        "expire_time": expire_time,
+        "protocol": protocol_config["protocol"],
+        "quality": protocol_config["quality"]
+    }
+
 
 class EzvizApi:
     """EZVIZ Cloud API client."""
@@ -42,15 +103,51 @@ class EzvizApi:
         return []
 
 
+def _endpoint(url: str) -> str:
+    """Return the endpoint path of an API URL (rate limiter key)."""
+    return urlparse(url).path
+
+
 class EzvizOpenApi:
     """EZVIZ Open Platform API client (IeuOpen) with authentication."""
 
-    def __init__(self, app_key: str = None, app_secret: str = None):
+    def __init__(
+        self,
+        app_key: str = None,
+        app_secret: str = None,
+        daily_quota: int = DEFAULT_DAILY_QUOTA,
+        hedge_requests: bool = DEFAULT_HEDGE_REQUESTS,
+    ):
         """Initialize EZVIZ Open Platform API client."""
         self.app_key = app_key
         self.app_secret = app_secret
         self.access_token: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        # Limiteur propre à la clé d'application, live/address/get a son propre budget
+        self.rate_limiter = RateLimiter(
+            DEFAULT_API_RATE,
+            DEFAULT_API_BURST,
+            {_endpoint(EZVIZ_OPEN_LIVE_URL): (DEFAULT_LIVE_RATE, DEFAULT_LIVE_BURST)},
+            daily_quota,
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._throttled_until: float = 0
+        # Latences observées, base du délai avant requête dupliquée
+        self.latency = LatencyTracker()
+        self.hedge_requests = hedge_requests
+        self.hedged = 0
+        # Passerelle régionale la plus proche (areaDomain du token, mesurée en RTT)
+        self.region = RegionSelector(EZVIZ_OPEN_BASE_URL)
+        # Protocole/qualité qui a fonctionné, partagé entre les canaux d'un appareil
+        self._protocol_choice: Dict[str, Dict[str, str]] = {}
+        # Index des capacités par appareil (DeviceCapabilities), rempli par CapabilityStore
+        self.capabilities: Dict[str, Any] = {}
+        self._live_list_supported: Optional[bool] = None
+        self._live_list: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._live_list_at: Optional[float] = None
+        self._live_list_lock = asyncio.Lock()
+        # Variantes dont l'URL n'a pas passé la validation, par appareil
+        self._bad_variants: Dict[str, Dict[Tuple[str, str], float]] = {}
         
     async def async_get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -60,41 +157,189 @@ class EzvizOpenApi:
         
     async def async_close(self):
         """Close aiohttp session."""
+        self.region.stop()
         if self.session and not self.session.closed:
             await self.session.close()
+
+    @property
+    def is_throttled(self) -> bool:
+        """Return true if this key should not take more background load right now."""
+        if time.monotonic() < self._throttled_until:
+            return True
+        if self.rate_limiter.headroom <= self.rate_limiter.daily_quota * INTERACTIVE_RESERVE:
+            return True
+        breaker = self._breakers.get(_endpoint(EZVIZ_OPEN_LIVE_URL))
+        return breaker is not None and breaker.is_open
+
+    def _resolve(self, url: str) -> str:
+        """Return the URL on the selected regional endpoint."""
+        if url == EZVIZ_OPEN_AUTH_URL:
+            # Le token est délivré par la passerelle globale, qui indique la région
+            return url
+        return f"{self.region.current}{_endpoint(url)}"
+
+    async def _async_post(
+        self, url: str, data: Dict[str, str], priority: int = PRIORITY_BACKGROUND
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Post a form to the Open Platform with rate limiting, retries and circuit breaking."""
+        endpoint = _endpoint(url)
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"API {endpoint} suspendue après des erreurs répétées")
+
+        if self.region.needs_probe:
+            self.region.schedule_probe()
+
+        # Requête de test du circuit demi-ouvert : libérer sa place si elle n'obtient aucune réponse
+        probing = breaker.opened_at > 0
+        status, result = 0, {}
+        reauthenticated = False
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                base = self.region.current
+                try:
+                    status, result = await self._async_post_once(url, data, priority)
+                    error = classify_response(status, result)
+                    if status >= 500 and url != EZVIZ_OPEN_AUTH_URL:
+                        self.region.report_failure(base)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Passer au prochain endpoint régional pour la tentative suivante
+                    if url != EZVIZ_OPEN_AUTH_URL:
+                        self.region.report_failure(base)
+                    if attempt == MAX_ATTEMPTS - 1:
+                        breaker.record_failure()
+                        raise
+                    _LOGGER.debug(f"EZVIZ Enhanced: Erreur réseau sur {endpoint}: {e}")
+                    error = ERROR_RETRYABLE
+
+                if error in (ERROR_NONE, ERROR_PERMANENT):
+                    # Une erreur définitive reste une réponse : l'API fonctionne
+                    breaker.record_success()
+                    return status, result
+
+                if error == ERROR_AUTH and "accessToken" in data and not reauthenticated:
+                    # Token expiré : se reconnecter puis rejouer immédiatement
+                    reauthenticated = True
+                    _LOGGER.info("🔑 EZVIZ Enhanced: Token expiré, nouvelle authentification")
+                    self.access_token = None
+                    if await self.async_authenticate(priority):
+                        data = {**data, "accessToken": self.access_token}
+                        continue
+                    breaker.record_success()
+                    return status, result
+
+                if error == ERROR_RATE_LIMIT:
+                    self._throttled_until = time.monotonic() + THROTTLE_COOLDOWN
+                breaker.record_failure()
+                if error != ERROR_RETRYABLE or attempt == MAX_ATTEMPTS - 1 or breaker.is_open:
+                    # Limite de débit ou auth : réessayer tout de suite aggraverait la situation
+                    break
+                await asyncio.sleep(backoff_delay(attempt))
+        except (QuotaExceeded, asyncio.CancelledError):
+            if probing:
+                breaker.release_probe()
+            raise
+
+        return status, result
+
+    def get_live_latency(self, q: float) -> Optional[float]:
+        """Return a percentile of the live address request latency (seconds)."""
+        return self.latency.percentile(_endpoint(EZVIZ_OPEN_LIVE_URL), q)
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Return after how long a duplicate request is sent, None to not hedge."""
+        if not self.hedge_requests or endpoint not in HEDGED_ENDPOINTS:
+            return None
+        if self.latency.count(endpoint) < DEFAULT_HEDGE_MIN_SAMPLES:
+            return None
+        delay = max(self.latency.percentile(endpoint, DEFAULT_HEDGE_PERCENTILE), 0.25)
+        if delay >= ENDPOINT_DEADLINES.get(endpoint, DEFAULT_DEADLINE):
+            return None
+        return delay
+
+    async def _async_post_once(
+        self, url: str, data: Dict[str, str], priority: int
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Post a form, duplicating it if it is slower than usual."""
+        endpoint = _endpoint(url)
+        hedge_delay = self._hedge_delay(endpoint)
+        if hedge_delay is None:
+            return await self._async_post_timed(url, data, priority)
+
+        # Le délai ne court qu'une fois la requête partie : l'attente du limiteur n'est pas de la latence
+        await self.rate_limiter.async_acquire(endpoint, priority)
+        tasks = [asyncio.ensure_future(self._async_post_timed(url, data, priority, acquired=True))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done and self.rate_limiter.try_acquire(endpoint, priority):
+                # Réponse plus lente que le percentile appris : doubler la requête, sans faire la queue
+                self.hedged += 1
+                _LOGGER.debug(f"EZVIZ Enhanced: Requête dupliquée sur {endpoint} après {hedge_delay:.2f}s")
+                tasks.append(asyncio.ensure_future(self._async_post_timed(url, data, priority, acquired=True)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        # La première réponse gagne
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _async_post_timed(
+        self, url: str, data: Dict[str, str], priority: int, acquired: bool = False
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Post a form within the endpoint deadline once the rate limiter allows it."""
+        endpoint = _endpoint(url)
+        if not acquired:
+            await self.rate_limiter.async_acquire(endpoint, priority)
+        session = await self.async_get_session()
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        timeout = aiohttp.ClientTimeout(total=ENDPOINT_DEADLINES.get(endpoint, DEFAULT_DEADLINE))
+        started = time.monotonic()
+        async with session.post(self._resolve(url), headers=headers, data=data, timeout=timeout) as response:
+            if response.status != 200:
+                return response.status, {}
+            result = await response.json()
+        self.latency.record(endpoint, time.monotonic() - started)
+        return response.status, result
     
-    async def async_authenticate(self) -> bool:
+    async def async_authenticate(self, priority: int = PRIORITY_BACKGROUND) -> bool:
         """Authenticate with EZVIZ Open Platform."""
         try:
-            session = await self.async_get_session()
-
             if not self.app_key or not self.app_secret:
                 _LOGGER.error("App Key and App Secret are required for EZVIZ Open authentication")
                 return False
 
             # EZVIZ Open Platform authentication
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
             data = {
                 "appKey": self.app_key,
                 "appSecret": self.app_secret
             }
 
-            async with session.post(EZVIZ_OPEN_AUTH_URL, headers=headers, data=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("code") == "200":
-                        self.access_token = result.get("data", {}).get("accessToken")
-                        _LOGGER.info("Authenticated with EZVIZ Open Platform")
-                        return True
-                    else:
-                        _LOGGER.error(f"EZVIZ Open authentication failed: {result.get('msg', 'Unknown error')}")
-                        return False
+            status, result = await self._async_post(EZVIZ_OPEN_AUTH_URL, data, priority)
+            if status == 200:
+                if result.get("code") == "200":
+                    self.access_token = result.get("data", {}).get("accessToken")
+                    self.region.set_area_domain(result.get("data", {}).get("areaDomain"))
+                    _LOGGER.info("Authenticated with EZVIZ Open Platform")
+                    return True
                 else:
-                    _LOGGER.error(f"EZVIZ Open authentication HTTP error: {response.status}")
+                    _LOGGER.error(f"EZVIZ Open authentication failed: {result.get('msg', 'Unknown error')}")
                     return False
+            else:
+                _LOGGER.error(f"EZVIZ Open authentication HTTP error: {status}")
+                return False
 
         except Exception as e:
             _LOGGER.error(f"EZVIZ Open authentication error: {e}")
@@ -145,98 +390,344 @@ class EzvizOpenApi:
             return []
             
         try:
-            session = await self.async_get_session()
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
             # EZVIZ Open API uses form data
             data = {
                 "accessToken": self.access_token
             }
             
-            async with session.post(EZVIZ_OPEN_DEVICE_URL, headers=headers, data=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("code") == "200":
-                        return result.get("data", [])
-                    else:
-                        _LOGGER.error(f"Error getting devices: {result.get('msg', 'Unknown error')}")
-                        return []
+            status, result = await self._async_post(EZVIZ_OPEN_DEVICE_URL, data)
+            if status == 200:
+                if result.get("code") == "200":
+                    return result.get("data", [])
                 else:
-                    _LOGGER.error(f"Failed to get devices: {response.status}")
+                    _LOGGER.error(f"Error getting devices: {result.get('msg', 'Unknown error')}")
                     return []
+            else:
+                _LOGGER.error(f"Failed to get devices: {status}")
+                return []
                     
         except Exception as e:
             _LOGGER.error(f"Error getting devices: {e}")
             return []
     
-    async def async_get_stream_info(self, serial: str, channel: int = 1) -> Dict[str, Any]:
-        """Get stream information from EZVIZ Open Platform with multiple protocols and qualities."""
+    async def async_get_capability(self, serial: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Get the (code, data) capability answer of a device, None if the API did not answer."""
         if not self.access_token:
             await self.async_authenticate()
             
         if not self.access_token:
-            return {}
+            return None
+        
+        data = {
+            "accessToken": self.access_token,
+            "deviceSerial": serial,
+        }
+        status, result = await self._async_post(EZVIZ_OPEN_CAPABILITY_URL, data)
+        if status != 200 or classify_response(status, result) not in (ERROR_NONE, ERROR_PERMANENT):
+            return None
+        return str(result.get("code")), result.get("data") or {}
+
+    def is_usable(self, serial: str, channel: int = 1) -> bool:
+        """Return false if the capability index rules the device or channel out."""
+        capabilities = self.capabilities.get(serial)
+        if capabilities is None:
+            return True
+        return capabilities.valid and capabilities.has_channel(channel)
+
+    async def async_get_device_page(
+        self, page_start: int, page_size: int
+    ) -> Tuple[Optional[List[Dict[str, Any]]], int]:
+        """Get one page of device/list as (devices, total), devices is None on failure."""
+        if not self.access_token:
+            await self.async_authenticate()
             
+        if not self.access_token:
+            return None, 0
+        
+        data = {
+            "accessToken": self.access_token,
+            "pageStart": str(page_start),
+            "pageSize": str(page_size),
+        }
         try:
-            session = await self.async_get_session()
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            # Try to get HLS Fluent (sub-bitrate) first as it's more stable
-            protocols_to_try = [
-                {"protocol": "2", "quality": "2", "name": "hls_fluent"},  # HLS Fluent
-                {"protocol": "2", "quality": "1", "name": "hls_hd"},      # HLS HD
-                {"protocol": "4", "quality": "2", "name": "flv_fluent"},  # FLV Fluent
-                {"protocol": "4", "quality": "1", "name": "flv_hd"},      # FLV HD
-            ]
+            status, result = await self._async_post(EZVIZ_OPEN_DEVICE_URL, data)
+        except Exception as e:
+            _LOGGER.error(f"Error getting devices: {e}")
+            return None, 0
+        
+        if status != 200 or result.get("code") != "200":
+            _LOGGER.error(f"Error getting devices: {result.get('msg', status)}")
+            return None, 0
+        
+        page = result.get("page") or {}
+        return result.get("data") or [], int(page.get("total", 0) or 0)
+
+    async def async_get_alarm_page(
+        self, start_time: int, end_time: int, page_start: int, page_size: int
+    ) -> Tuple[Optional[List[Dict[str, Any]]], int]:
+        """Get one page of alarm/list for every device as (alarms, total), alarms is None on failure."""
+        if not self.access_token:
+            await self.async_authenticate()
             
-            for protocol_config in protocols_to_try:
-                data = {
-                    "accessToken": self.access_token,
-                    "deviceSerial": serial,
-                    "channelNo": str(channel),
-                    "protocol": protocol_config["protocol"],
-                    "quality": protocol_config["quality"],
-                    "expireTime": "3600"  # 1 hour validity
-                }
+        if not self.access_token:
+            return None, 0
+        
+        # Sans deviceSerial : les alarmes de tous les appareils du compte en un appel
+        data = {
+            "accessToken": self.access_token,
+            "startTime": str(start_time),
+            "endTime": str(end_time),
+            "status": "2",
+            "alarmType": "-1",
+            "pageStart": str(page_start),
+            "pageSize": str(page_size),
+        }
+        try:
+            status, result = await self._async_post(EZVIZ_OPEN_ALARM_URL, data)
+        except (QuotaExceeded, CircuitOpenError) as e:
+            _LOGGER.debug(f"EZVIZ Enhanced: alarm/list différé: {e}")
+            return None, 0
+        except Exception as e:
+            _LOGGER.error(f"Error getting alarms: {e}")
+            return None, 0
+        
+        if status != 200 or result.get("code") != "200":
+            _LOGGER.error(f"Error getting alarms: {result.get('msg', status)}")
+            return None, 0
+        
+        page = result.get("page") or {}
+        return result.get("data") or [], int(page.get("total", 0) or 0)
+
+    def mark_variant_failed(self, serial: str, protocol: Optional[str], quality: Optional[str]):
+        """Set aside a protocol/quality variant whose URL failed validation."""
+        if protocol is None or quality is None:
+            return
+        self._bad_variants.setdefault(serial, {})[(protocol, quality)] = time.monotonic() + BAD_VARIANT_COOLDOWN
+        learned = self._protocol_choice.get(serial)
+        if learned and (learned["protocol"], learned["quality"]) == (protocol, quality):
+            del self._protocol_choice[serial]
+
+    def _is_bad_variant(self, serial: str, config: Dict[str, str]) -> bool:
+        """Return true if a variant is set aside for a device."""
+        until = self._bad_variants.get(serial, {}).get((config["protocol"], config["quality"]))
+        return until is not None and time.monotonic() < until
+
+    def _protocols_for(self, serial: str) -> List[Dict[str, str]]:
+        """Return the protocol chain, starting with the choice learned for the device."""
+        chain = list(PROTOCOLS_TO_TRY)
+        capabilities = self.capabilities.get(serial)
+        if capabilities is not None:
+            # Ne pas demander de variantes que l'appareil ne sait pas fournir
+            chain = [
+                config for config in chain if capabilities.supports(config["protocol"], config["quality"])
+            ] or chain
+        # Variantes en échec de validation en dernier recours
+        chain = [config for config in chain if not self._is_bad_variant(serial, config)] + [
+            config for config in chain if self._is_bad_variant(serial, config)
+        ]
+        learned = self._protocol_choice.get(serial)
+        if learned is None or learned not in chain:
+            return chain
+        return [learned] + [config for config in chain if config is not learned]
+
+    async def _async_fetch_live_address(
+        self, serial: str, channel: int, protocol_config: Dict[str, str], priority: int = PRIORITY_BACKGROUND
+    ) -> Optional[Dict[str, Any]]:
+        """Request one live address variant, returning the stream info on success."""
+        data = {
+            "accessToken": self.access_token,
+            "deviceSerial": serial,
+            "channelNo": str(channel),
+            "protocol": protocol_config["protocol"],
+            "quality": protocol_config["quality"],
+            "expireTime": "3600"  # 1 hour validity
+        }
+        
+        status, result = await self._async_post(EZVIZ_OPEN_LIVE_URL, data, priority)
+        if status == 200:
+            if result.get("code") == "200":
+                stream_data = result.get("data", {})
+                url = stream_data.get("url")
                 
-                async with session.post(EZVIZ_OPEN_LIVE_URL, headers=headers, data=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("code") == "200":
-                            stream_data = result.get("data", {})
-                            url = stream_data.get("url")
-                            expire_time = stream_data.get("expireTime")
-                            
-                            if url:
-                                _LOGGER.info(f"Successfully got {protocol_config['name']} stream for {serial}")
-                                return {
-                                    "serial": serial,
-                                    "channel": channel,
-                                    "status": "online",
-                                    "stream_type": protocol_config["name"],
-                                    "hls_url": url if "hls" in protocol_config["name"] else None,
-                                    "flv_url": url if "flv" in protocol_config["name"] else None,
-                                    "rtsp_url": None,  # Will be generated by converter
-                                    "cloud_url": url,
-                                    "expire_time": expire_time,
-                                    "protocol": protocol_config["protocol"],
-                                    "quality": protocol_config["quality"]
-                                }
-                        else:
-                            _LOGGER.warning(f"Failed to get {protocol_config['name']}: {result.get('msg', 'Unknown error')}")
-                    else:
-                        _LOGGER.warning(f"HTTP error for {protocol_config['name']}: {response.status}")
+                if url:
+                    _LOGGER.info(f"Successfully got {protocol_config['name']} stream for {serial} (channel {channel})")
+                    return _build_stream_info(
+                        serial, channel, protocol_config, url, stream_data.get("expireTime")
+                    )
+            else:
+                _LOGGER.warning(f"Failed to get {protocol_config['name']}: {result.get('msg', 'Unknown error')}")
+        else:
+            _LOGGER.warning(f"HTTP error for {protocol_config['name']}: {status}")
+        return None
+
+    async def async_get_stream_info(
+        self, serial: str, channel: int = 1, priority: int = PRIORITY_BACKGROUND
+    ) -> Dict[str, Any]:
+        """Get stream information from EZVIZ Open Platform with multiple protocols and qualities."""
+        if not self.access_token:
+            await self.async_authenticate(priority)
+            
+        if not self.access_token:
+            return {}
+        
+        if not self.is_usable(serial, channel):
+            _LOGGER.debug(f"EZVIZ Enhanced: {serial} canal {channel} absent de l'index des capacités")
+            return {}
+            
+        try:
+            # Try to get HLS Fluent (sub-bitrate) first as it's more stable,
+            # or the variant that already worked for this device
+            for protocol_config in self._protocols_for(serial):
+                stream_info = await self._async_fetch_live_address(serial, channel, protocol_config, priority)
+                if stream_info:
+                    self._protocol_choice[serial] = protocol_config
+                    return stream_info
+                if time.monotonic() < self._throttled_until:
+                    # Limité par la plateforme : inutile d'essayer les autres variantes
+                    _LOGGER.warning(f"⏳ EZVIZ Enhanced: Clé limitée par la plateforme, {serial} reporté")
+                    return {}
             
             _LOGGER.error(f"No working stream found for {serial}")
             return {}
+        
+        except (QuotaExceeded, CircuitOpenError) as e:
+            _LOGGER.warning(f"⏳ EZVIZ Enhanced: Renouvellement de {serial} reporté: {e}")
+            return {}
                     
         except Exception as e:
             _LOGGER.error(f"Error getting stream info: {e}")
             return {}
+
+    async def async_get_stream_infos(self, serial: str, channels: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get stream information for several channels of one device (NVR) at once."""
+        channels = [channel for channel in channels if self.is_usable(serial, channel)]
+        if not channels:
+            return {}
+        
+        if len(channels) == 1:
+            stream_info = await self.async_get_stream_info(serial, channels[0])
+            return {channels[0]: stream_info} if stream_info else {}
+        
+        if not self.access_token:
+            await self.async_authenticate()
+            
+        if not self.access_token:
+            return {}
+        
+        # 1. Liste multi-adresses de la plateforme, si le compte y a accès
+        results = await self._async_get_live_list(serial, channels)
+        remaining = [channel for channel in channels if channel not in results]
+        if not remaining:
+            return results
+        
+        # 2. Apprendre le protocole sur un premier canal si besoin (chaîne complète, une fois par canal)
+        while serial not in self._protocol_choice and remaining:
+            first = remaining.pop(0)
+            stream_info = await self.async_get_stream_info(serial, first)
+            if stream_info:
+                results[first] = stream_info
+            elif time.monotonic() < self._throttled_until:
+                return results
+        
+        # 3. Requêtes concurrentes pour les canaux frères avec le protocole appris
+        learned = self._protocol_choice.get(serial)
+        failed: List[int] = []
+        if learned and remaining:
+            fetched = await asyncio.gather(
+                *(self._async_fetch_live_address(serial, channel, learned) for channel in remaining),
+                return_exceptions=True,
+            )
+            for channel, stream_info in zip(remaining, fetched):
+                if isinstance(stream_info, Exception):
+                    _LOGGER.error(f"Error getting stream info for {serial} channel {channel}: {stream_info}")
+                    failed.append(channel)
+                elif stream_info:
+                    results[channel] = stream_info
+                else:
+                    failed.append(channel)
+        
+        # 4. Chaîne complète uniquement pour les canaux en échec avec le protocole appris
+        for channel in failed:
+            stream_info = await self.async_get_stream_info(serial, channel)
+            if stream_info:
+                results[channel] = stream_info
+        
+        return results
+
+    async def _async_get_live_list(self, serial: str, channels: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get live addresses of a device from the platform multi-address listing."""
+        if self._live_list_supported is False:
+            return {}
+        
+        live_list = await self._async_load_live_list()
+        results: Dict[int, Dict[str, Any]] = {}
+        for channel in channels:
+            entry = live_list.get((serial, channel))
+            # status 1 = adresse active
+            if entry is None or str(entry.get("status")) != "1":
+                continue
+            url = entry.get("hls") or entry.get("hlsHd")
+            if not url:
+                continue
+            protocol_config = PROTOCOLS_TO_TRY[0] if entry.get("hls") else PROTOCOLS_TO_TRY[1]
+            results[channel] = _build_stream_info(serial, channel, protocol_config, url, entry.get("endTime"))
+        
+        return results
+
+    async def _async_load_live_list(self) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """Return the live address listing of the account, fetched at most once per cycle."""
+        async with self._live_list_lock:
+            if self._live_list_at is not None and time.monotonic() - self._live_list_at < LIVE_LIST_MAX_AGE:
+                return self._live_list
+            
+            entries, total = await self._async_get_live_list_page(0)
+            if entries is not None:
+                pages = min(math.ceil(total / LIVE_LIST_PAGE_SIZE), LIVE_LIST_MAX_PAGES) if total else 1
+                if pages > 1:
+                    results = await asyncio.gather(
+                        *(self._async_get_live_list_page(page) for page in range(1, pages))
+                    )
+                    for page_entries, _total in results:
+                        if page_entries is None:
+                            # Page manquante : les canaux absents passent par live/address/get
+                            break
+                        entries.extend(page_entries)
+            
+            # Même en échec : un seul essai par cycle, pas un par appareil
+            self._live_list = {
+                (entry.get("deviceSerial"), int(entry.get("channelNo", 0) or 0)): entry
+                for entry in entries or []
+            }
+            self._live_list_at = time.monotonic()
+            return self._live_list
+
+    async def _async_get_live_list_page(self, page_start: int) -> Tuple[Optional[List[Dict[str, Any]]], int]:
+        """Get one page of live/video/list as (entries, total), entries is None on failure."""
+        data = {
+            "accessToken": self.access_token,
+            "pageStart": str(page_start),
+            "pageSize": str(LIVE_LIST_PAGE_SIZE),
+        }
+        try:
+            status, result = await self._async_post(EZVIZ_OPEN_LIVE_LIST_URL, data)
+        except Exception as e:
+            _LOGGER.debug(f"Error getting live address listing: {e}")
+            return None, 0
+        
+        code = str(result.get("code"))
+        if status == 404 or code in LIVE_LIST_UNSUPPORTED_CODES:
+            # Pas de liste multi-adresses pour ce compte : ne plus essayer
+            _LOGGER.debug(f"Live address listing unsupported: {result.get('msg', status)}")
+            self._live_list_supported = False
+            return None, 0
+        if status != 200 or code != "200":
+            # Échec passager : nouvel essai au prochain cycle
+            _LOGGER.debug(f"Live address listing unavailable: {result.get('msg', status)}")
+            return None, 0
+        
+        self._live_list_supported = True
+        page = result.get("page") or {}
+        return result.get("data") or [], int(page.get("total", 0) or 0)
     
     async def async_get_hls_url(self, serial: str, channel: int = 1) -> Optional[str]:
         """Get HLS URL for the camera."""
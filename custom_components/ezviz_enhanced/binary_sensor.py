@@ -1,13 +1,19 @@
 """Binary sensor platform for EZVIZ Enhanced integration."""
 import logging
+import time
 from typing import Any, Dict, Optional
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 
-from .const import DOMAIN
+from .alarm import AlarmEvent
+from .const import (
+    DOMAIN, DEFAULT_MOTION_HOLD,
+    ATTR_ALARM_ID, ATTR_ALARM_TYPE, ATTR_ALARM_NAME, ATTR_ALARM_TIME, ATTR_ALARM_PICTURE,
+)
 from .coordinator import EzvizDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,9 +30,10 @@ async def async_setup_entry(
     entities = []
     
     # Add binary sensors for each camera
-    for serial, camera_data in coordinator.cameras.items():
-        if camera_data.get("enabled", True):
-            entities.append(EzvizEnhancedBinarySensor(coordinator, serial, config_entry.entry_id))
+    for serial in coordinator.cameras:
+        entities.append(EzvizEnhancedBinarySensor(coordinator, serial, config_entry.entry_id))
+        if coordinator.alarm_ingestor:
+            entities.append(EzvizMotionBinarySensor(coordinator, serial, config_entry.entry_id))
 
     async_add_entities(entities)
 
@@ -34,6 +41,8 @@ async def async_setup_entry(
 class EzvizEnhancedBinarySensor(BinarySensorEntity):
     """Representation of an EZVIZ Enhanced binary sensor."""
 
+    _attr_should_poll = False
+
     def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, entry_id: str) -> None:
         """Initialize the binary sensor."""
         self.coordinator = coordinator
@@ -51,8 +60,8 @@ class EzvizEnhancedBinarySensor(BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        camera_data = self.coordinator.cameras.get(self.serial, {})
-        return camera_data.get("status") == "online"
+        camera_state = self.coordinator.cameras.get(self.serial)
+        return camera_state is not None and camera_state.online
 
     @property
     def available(self) -> bool:
@@ -62,9 +71,76 @@ class EzvizEnhancedBinarySensor(BinarySensorEntity):
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_camera_listener(self.serial, self.async_write_ha_state)
+        )
+
+
+class EzvizMotionBinarySensor(BinarySensorEntity):
+    """Motion detected from the EZVIZ alarm messages of a camera, cleared after a hold time."""
+
+    _attr_should_poll = False
+    _attr_device_class = BinarySensorDeviceClass.MOTION
+
+    def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, entry_id: str) -> None:
+        """Initialize the binary sensor."""
+        self.coordinator = coordinator
+        self.serial = serial
+        self.entry_id = entry_id
+        self._attr_name = f"EZVIZ {serial} Motion"
+        self._attr_unique_id = f"{DOMAIN}_binary_sensor_{serial}_motion_{entry_id[:8]}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, serial)},
+            "name": f"EZVIZ Camera {serial}",
+            "manufacturer": "EZVIZ",
+            "model": "Enhanced Camera",
+        }
+        self._attr_is_on = False
+        self._event: Optional[AlarmEvent] = None
+        self._cancel_off: Optional[CALLBACK_TYPE] = None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the last alarm."""
+        if self._event is None:
+            return {}
+        return {
+            ATTR_ALARM_ID: self._event.alarm_id,
+            ATTR_ALARM_TYPE: self._event.alarm_type,
+            ATTR_ALARM_NAME: self._event.name,
+            ATTR_ALARM_TIME: self._event.alarm_time,
+            ATTR_ALARM_PICTURE: self._event.picture_url,
+        }
+
+    @callback
+    def _handle_alarm(self, event: AlarmEvent) -> None:
+        """Turn on for a new alarm and (re)arm the auto-off."""
+        if time.time() - event.alarm_time / 1000 > self.coordinator.alarm_ingestor.replay_age:
+            # Alarme d'une fenêtre relue (après une interruption) : le mouvement est terminé depuis longtemps
+            _LOGGER.debug(f"EZVIZ Enhanced: Alarme {event.alarm_id} relue ignorée pour {self.serial}")
+            return
+        # Alarme fraîche mais reçue avec le retard d'indexation et de polling : maintien compté depuis la réception
+        self._event = event
+        self._attr_is_on = True
+        if self._cancel_off:
+            self._cancel_off()
+        self._cancel_off = async_call_later(self.hass, DEFAULT_MOTION_HOLD, self._handle_motion_off)
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_motion_off(self, _now) -> None:
+        """Clear the motion state once the hold time has passed."""
+        self._cancel_off = None
+        self._attr_is_on = False
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        self.async_on_remove(
+            self.coordinator.alarm_ingestor.async_add_listener(self.serial, self._handle_alarm)
         )
 
-    async def async_update(self) -> None:
-        """Update the entity."""
-        await self.coordinator.async_request_refresh()
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending auto-off."""
+        if self._cancel_off:
+            self._cancel_off()
+            self._cancel_off = None
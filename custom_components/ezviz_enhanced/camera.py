@@ -1,15 +1,25 @@
 """Camera platform for EZVIZ Enhanced integration."""
 import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Dict, Optional
 
 from homeassistant.components.camera import Camera, CameraEntityFeature
+from homeassistant.components.stream import CONF_RTSP_TRANSPORT
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, ATTR_SERIAL, ATTR_CHANNEL, ATTR_DEVICE_TYPE, ATTR_RTSP_URL, ATTR_IEUOPEN_URL, ATTR_HLS_URL, ATTR_RTSP_LOCAL_URL
+from .const import (
+    DOMAIN, ATTR_SERIAL, ATTR_CHANNEL, ATTR_DEVICE_TYPE, ATTR_RTSP_URL, ATTR_IEUOPEN_URL, ATTR_HLS_URL, ATTR_RTSP_LOCAL_URL,
+    ATTR_SNAPSHOT_HITS, ATTR_SNAPSHOT_MISSES, ATTR_SNAPSHOT_LATENCY,
+    ATTR_STREAM_SOURCE,
+)
 from .coordinator import EzvizDataUpdateCoordinator
+from .models import CameraState
+from .hls import is_hls_url
+from .snapshot import async_ffmpeg_snapshot, async_hls_keyframe_snapshot, size_bucket
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,11 +33,11 @@ async def async_setup_entry(
     coordinator: EzvizDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
     cameras = []
-    for serial, camera_data in coordinator.data.get("cameras", {}).items():
-        if camera_data.get("enabled", True):
-            cameras.append(EzvizEnhancedCamera(coordinator, config_entry, serial, camera_data))
+    # Caméras désactivées incluses : l'interrupteur les réactive sans rechargement
+    for serial, camera_state in coordinator.data.get("cameras", {}).items():
+        cameras.append(EzvizEnhancedCamera(coordinator, config_entry, serial, camera_state))
 
-    async_add_entities(cameras, True)
+    async_add_entities(cameras)
 
 
 class EzvizEnhancedCamera(Camera):
@@ -36,31 +46,33 @@ class EzvizEnhancedCamera(Camera):
     # Déclarer explicitement le support du streaming
     _attr_supported_features = CameraEntityFeature.STREAM
     _attr_brand = "EZVIZ"
+    # Mises à jour poussées par le coordinator, pas de polling par entité
+    _attr_should_poll = False
 
     def __init__(
         self,
         coordinator: EzvizDataUpdateCoordinator,
         config_entry: ConfigEntry,
         serial: str,
-        camera_data: dict,
+        camera_state: CameraState,
     ):
         """Initialize the camera."""
         super().__init__()
         self.coordinator = coordinator
         self.config_entry = config_entry
         self.serial = serial
-        self.camera_data = camera_data
-        self._name = camera_data.get("name", f"EZVIZ {serial}")
-        self._channel = camera_data.get("channel", 1)
-        self._device_type = camera_data.get("device_type", "camera")
-        self._rtsp_url = camera_data.get("rtsp_url")
-        self._hls_url = camera_data.get("hls_url")
-        self._stream_url = camera_data.get("stream_url")
-        self._ieuopen_url = camera_data.get("ieuopen_url")
-        self._rtsp_local_url = camera_data.get("rtsp_local_url")
+        # Enregistrement partagé avec le coordinator (pas de copie des URLs)
+        self.camera_state = camera_state
+        self._name = camera_state.name
+        self._channel = camera_state.channel
         self._last_url = None
+        self._last_hls_url = camera_state.hls_url
+        self._webrtc_ready = coordinator.go2rtc_manager.has_stream(serial)
+        if coordinator.ll_hls_enabled:
+            # Flux local go2rtc : TCP évite les pertes de paquets qui cassent les segments partiels
+            self.stream_options[CONF_RTSP_TRANSPORT] = "tcp"
         
-        _LOGGER.info(f"✅ EZVIZ Enhanced Camera initialisée: {self._name}, HLS: {bool(self._hls_url)}, RTSP Local: {bool(self._rtsp_local_url)}")
+        _LOGGER.info(f"✅ EZVIZ Enhanced Camera initialisée: {self._name}, HLS: {bool(camera_state.hls_url)}, RTSP Local: {bool(camera_state.rtsp_local_url)}")
 
     @property
     def name(self) -> str:
@@ -91,25 +103,33 @@ class EzvizEnhancedCamera(Camera):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes."""
+        state = self.camera_state
         attrs = {
             ATTR_SERIAL: self.serial,
             ATTR_CHANNEL: self._channel,
-            ATTR_DEVICE_TYPE: self._device_type,
-            ATTR_RTSP_URL: self._rtsp_url,
-            ATTR_HLS_URL: self._hls_url,
-            ATTR_IEUOPEN_URL: self._ieuopen_url,
+            ATTR_DEVICE_TYPE: state.device_type,
+            ATTR_RTSP_URL: state.stream_url if state.converted else None,
+            ATTR_HLS_URL: state.hls_url,
+            ATTR_IEUOPEN_URL: state.ieuopen_url,
         }
         
         # Ajouter l'URL RTSP locale si disponible
-        if self._rtsp_local_url:
-            attrs[ATTR_RTSP_LOCAL_URL] = self._rtsp_local_url
+        if state.rtsp_local_url:
+            attrs[ATTR_RTSP_LOCAL_URL] = state.rtsp_local_url
+        
+        # Statistiques du cache de miniatures
+        stats = self.coordinator.snapshot_cache.get_stats(self.serial)
+        attrs[ATTR_SNAPSHOT_HITS] = stats["hits"] + stats["stale_hits"]
+        attrs[ATTR_SNAPSHOT_MISSES] = stats["misses"]
+        attrs[ATTR_SNAPSHOT_LATENCY] = self.coordinator.snapshot_cache.get_latency(self.serial)
+        attrs[ATTR_STREAM_SOURCE] = self.coordinator.source_selector.get_selected(self.serial)
         
         return attrs
 
     @property
     def is_streaming(self) -> bool:
         """Return true if the camera is streaming."""
-        return self._hls_url is not None or self._stream_url is not None
+        return self.camera_state.hls_url is not None or self.camera_state.stream_url is not None
 
     async def async_camera_image(
         self, width: Optional[int] = None, height: Optional[int] = None
@@ -117,6 +137,30 @@ class EzvizEnhancedCamera(Camera):
         """Return bytes of camera image."""
         _LOGGER.debug(f"EZVIZ Enhanced: Demande d'image miniature pour {self.serial}")
         
+        # Extracteur persistant : la dernière frame est déjà en mémoire
+        if self.coordinator.frame_extractor_enabled:
+            frame = await self.coordinator.async_get_live_frame(self.serial)
+            if frame:
+                return frame
+        
+        # Les requêtes concurrentes partagent une seule extraction via le cache
+        return await self.coordinator.snapshot_cache.async_get(
+            self.serial, self._async_fetch_camera_image, size_bucket(width, height)
+        )
+
+    async def _async_fetch_camera_image(self, bucket: Optional[int]) -> Optional[Dict[Optional[int], bytes]]:
+        """Extract a fresh image (and its resized variant) from the stream."""
+        cache = self.coordinator.snapshot_cache
+        
+        # Restream go2rtc local : aucune bande passante cloud consommée
+        if self.coordinator.get_rtsp_local_url(self.serial):
+            started = time.monotonic()
+            image = await self.coordinator.go2rtc_manager.async_get_frame(self.serial, width=bucket)
+            if image:
+                cache.record_latency(self.serial, "go2rtc", time.monotonic() - started)
+                return {bucket: image}
+            _LOGGER.debug(f"EZVIZ Enhanced: go2rtc sans image pour {self.serial}, repli sur FFmpeg")
+        
         # Obtenir l'URL du stream
         stream_url = await self.stream_source()
         
@@ -124,41 +168,44 @@ class EzvizEnhancedCamera(Camera):
             _LOGGER.error(f"🔴 EZVIZ Enhanced: Pas d'URL pour générer la miniature de {self.serial}")
             return None
         
+        # HLS : ne télécharger que le début du segment le plus récent
+        if is_hls_url(stream_url):
+            started = time.monotonic()
+            try:
+                images = await async_hls_keyframe_snapshot(
+                    async_get_clientsession(self.hass), stream_url, bucket
+                )
+            except Exception as e:
+                _LOGGER.debug(f"EZVIZ Enhanced: Miniature par segment HLS impossible pour {self.serial}: {e}")
+                images = None
+            if images:
+                cache.record_latency(self.serial, "hls_segment", time.monotonic() - started)
+                return images
+        
         try:
             # Utiliser FFmpeg pour extraire une image du stream HLS
-            ffmpeg_cmd = [
-                "ffmpeg",
-                "-i", stream_url,
-                "-frames:v", "1",  # Une seule frame
-                "-f", "image2",
-                "-c:v", "mjpeg",
-                "-q:v", "2",  # Qualité (2-31, 2 = meilleure)
-                "pipe:1"
-            ]
-            
-            _LOGGER.debug(f"EZVIZ Enhanced: Génération de la miniature avec FFmpeg...")
-            
-            process = await asyncio.create_subprocess_exec(
-                *ffmpeg_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=10)
-            
-            if process.returncode == 0 and stdout:
-                _LOGGER.debug(f"EZVIZ Enhanced: Miniature générée avec succès ({len(stdout)} bytes)")
-                return stdout
-            else:
-                _LOGGER.warning(f"EZVIZ Enhanced: Échec FFmpeg: {stderr.decode()[:200]}")
-                return None
+            started = time.monotonic()
+            images = await async_ffmpeg_snapshot(stream_url, bucket)
+            if images:
+                cache.record_latency(self.serial, "ffmpeg", time.monotonic() - started)
+                return images
                 
         except asyncio.TimeoutError:
             _LOGGER.error(f"🔴 EZVIZ Enhanced: Timeout lors de la génération de la miniature")
-            return None
         except Exception as e:
             _LOGGER.error(f"🔴 EZVIZ Enhanced: Erreur lors de la génération de la miniature: {e}")
-            return None
+        
+        # La source sélectionnée ne répond pas : la reclasser
+        self._report_source_failure()
+        return None
+
+    def _report_source_failure(self):
+        """Report the currently selected stream source as failing."""
+        source = self.coordinator.source_selector.get_selected(self.serial)
+        if source:
+            self.coordinator.source_selector.report_failure(
+                self.serial, source, self.coordinator.get_stream_candidates(self.serial)
+            )
 
     async def stream_source(self) -> Optional[str]:
         """Return the source of the stream."""
@@ -169,9 +216,19 @@ class EzvizEnhancedCamera(Camera):
         
         if stream_url:
             self._last_url = stream_url
-            self._hls_url = stream_url
-            self._stream_url = stream_url
-            _LOGGER.debug(f"EZVIZ Enhanced: URL stream retournée: {stream_url[:100]}...")
+            
+            # Mode LL-HLS : le worker stream de HA découpe le flux local en segments partiels
+            local_url = self.coordinator.get_rtsp_local_url(self.serial)
+            if self.coordinator.ll_hls_enabled and local_url:
+                return local_url
+            
+            # Choisir la source candidate la plus rapide (go2rtc local ou cloud)
+            selected = self.coordinator.source_selector.select(
+                self.serial, self.coordinator.get_stream_candidates(self.serial)
+            )
+            if selected:
+                source, stream_url = selected
+                _LOGGER.debug(f"EZVIZ Enhanced: Source {source} retournée: {stream_url[:100]}...")
             return stream_url
         
         # Fallback sur les URLs stockées
@@ -179,44 +236,47 @@ class EzvizEnhancedCamera(Camera):
             _LOGGER.debug(f"EZVIZ Enhanced: Utilisation dernière URL connue")
             return self._last_url
             
-        if self._hls_url:
+        if self.camera_state.hls_url:
             _LOGGER.debug(f"EZVIZ Enhanced: Utilisation HLS URL initiale")
-            return self._hls_url
+            return self.camera_state.hls_url
         
-        if self._stream_url:
-            _LOGGER.debug(f"EZVIZ Enhanced: Utilisation stream URL")
-            return self._stream_url
-        
-        if self._rtsp_url:
+        if self.camera_state.rtsp_local_url:
             _LOGGER.debug(f"EZVIZ Enhanced: Utilisation RTSP URL")
-            return self._rtsp_url
+            return self.camera_state.rtsp_local_url
         
         _LOGGER.warning(f"EZVIZ Enhanced: Aucune source de stream trouvée pour {self.serial}")
         return None
     
     @property
-    def frontend_stream_type(self):
-        """Return the type of stream supported by this camera."""
-        # Indiquer explicitement que c'est un stream HLS
-        return "hls"
-
-    async def async_update(self):
-        """Update camera data."""
-        await self.coordinator.async_request_refresh()
-        
-        # Update camera data
-        camera_data = await self.coordinator.async_get_camera(self.serial)
-        if camera_data:
-            self.camera_data = camera_data
-            old_hls = self._hls_url
-            self._rtsp_url = camera_data.get("rtsp_url")
-            self._hls_url = camera_data.get("hls_url")
-            self._stream_url = camera_data.get("stream_url")
-            self._ieuopen_url = camera_data.get("ieuopen_url")
-            self._rtsp_local_url = camera_data.get("rtsp_local_url")
-            
-            if self._hls_url != old_hls:
+    def available(self) -> bool:
+        """Return if entity is available."""
+        camera_state = self.coordinator.cameras.get(self.serial)
+        return self.coordinator.last_update_success and (camera_state is None or camera_state.enabled)
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_camera_listener(self.serial, self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update camera data from the coordinator."""
+        camera_state = self.coordinator.cameras.get(self.serial)
+        if camera_state:
+            self.camera_state = camera_state
+            if camera_state.hls_url != self._last_hls_url:
+                self._last_hls_url = camera_state.hls_url
                 _LOGGER.info(f"EZVIZ Enhanced: URL HLS mise à jour pour {self.serial}")
+        
+        # Source ou flux go2rtc changés : réévaluer le fournisseur WebRTC (HLS reste annoncé)
+        webrtc_ready = self.coordinator.go2rtc_manager.has_stream(self.serial)
+        if webrtc_ready != self._webrtc_ready:
+            self._webrtc_ready = webrtc_ready
+            self.hass.async_create_task(self.async_refresh_providers())
+        
+        self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self):
         """Clean up when entity is removed."""
@@ -0,0 +1,160 @@
+"""Device capability index for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DEFAULT_CAPABILITY_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}_capabilities"
+
+# Protocoles du endpoint live/address/get
+PROTOCOL_HLS = "2"
+PROTOCOL_FLV = "4"
+# Qualités : 1 = HD (flux principal), 2 = fluide (sous-flux)
+QUALITY_HD = "1"
+QUALITY_FLUENT = "2"
+
+# Codes indiquant un appareil inutilisable avec ces identifiants
+INVALID_DEVICE_CODES = {"20002", "20014", "20018"}
+
+RETRY_INTERVAL = 3600  # Délai avant de redemander des capacités restées sans réponse
+
+
+class DeviceCapabilities:
+    """Supported protocols, qualities and channels of one device."""
+
+    __slots__ = ("serial", "valid", "protocols", "qualities", "channels", "fetched_at")
+
+    def __init__(
+        self,
+        serial: str,
+        valid: bool = True,
+        protocols: Iterable[str] = (PROTOCOL_HLS, PROTOCOL_FLV),
+        qualities: Iterable[str] = (QUALITY_HD, QUALITY_FLUENT),
+        channels: Optional[int] = None,
+        fetched_at: float = 0,
+    ):
+        """Initialize device capabilities."""
+        self.serial = serial
+        self.valid = valid
+        self.protocols = frozenset(protocols)
+        self.qualities = frozenset(qualities)
+        self.channels = channels
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_response(cls, serial: str, code: str, data: Dict[str, Any]) -> "DeviceCapabilities":
+        """Parse a device/capability response."""
+        now = time.time()
+        if code in INVALID_DEVICE_CODES:
+            return cls(serial, valid=False, fetched_at=now)
+
+        # Un champ absent vaut « supporté » : on ne retire que ce qui est explicitement refusé
+        protocols = {PROTOCOL_HLS, PROTOCOL_FLV}
+        if str(data.get("support_hls", "1")) == "0":
+            protocols.discard(PROTOCOL_HLS)
+        if str(data.get("support_flv", "1")) == "0":
+            protocols.discard(PROTOCOL_FLV)
+
+        qualities = {QUALITY_HD, QUALITY_FLUENT}
+        if str(data.get("support_sub_stream", "1")) == "0":
+            qualities.discard(QUALITY_FLUENT)
+
+        channels = data.get("channelNumber") or data.get("support_channel_number")
+        try:
+            channels = int(channels) if channels else None
+        except (TypeError, ValueError):
+            channels = None
+
+        return cls(serial, True, protocols or {PROTOCOL_HLS, PROTOCOL_FLV}, qualities, channels, now)
+
+    def supports(self, protocol: str, quality: str) -> bool:
+        """Return true if the device can serve a protocol/quality variant."""
+        return protocol in self.protocols and quality in self.qualities
+
+    def has_channel(self, channel: int) -> bool:
+        """Return true if the channel exists on the device."""
+        return self.channels is None or 1 <= channel <= self.channels
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the capabilities as a storable dictionary."""
+        return {
+            "valid": self.valid,
+            "protocols": sorted(self.protocols),
+            "qualities": sorted(self.qualities),
+            "channels": self.channels,
+            "fetched_at": self.fetched_at,
+        }
+
+
+class CapabilityStore:
+    """Fetch device capabilities once and keep them in HA storage."""
+
+    def __init__(self, hass, ezviz_open_api, ttl: float = DEFAULT_CAPABILITY_TTL):
+        """Initialize capability store."""
+        self.ezviz_open_api = ezviz_open_api
+        self.ttl = ttl
+        # Index porté par le client, partagé entre les entrées qui l'utilisent
+        self.index: Dict[str, DeviceCapabilities] = ezviz_open_api.capabilities
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._loaded = False
+        self._attempted_at: Dict[str, float] = {}
+
+    async def async_load(self):
+        """Load cached capabilities from storage."""
+        if self._loaded:
+            return
+        self._loaded = True
+        data = await self._store.async_load() or {}
+        for serial, record in data.items():
+            self.index[serial] = DeviceCapabilities(
+                serial,
+                record.get("valid", True),
+                record.get("protocols", (PROTOCOL_HLS, PROTOCOL_FLV)),
+                record.get("qualities", (QUALITY_HD, QUALITY_FLUENT)),
+                record.get("channels"),
+                record.get("fetched_at", 0),
+            )
+
+    async def async_ensure(self, serials: Iterable[str]):
+        """Fetch the capabilities of devices that are unknown or stale."""
+        await self.async_load()
+        now = time.time()
+        missing = [
+            serial for serial in set(serials)
+            if (serial not in self.index or now - self.index[serial].fetched_at > self.ttl)
+            and now - self._attempted_at.get(serial, -RETRY_INTERVAL) >= RETRY_INTERVAL
+        ]
+        if not missing:
+            return
+        for serial in missing:
+            self._attempted_at[serial] = now
+
+        results = await asyncio.gather(
+            *(self.ezviz_open_api.async_get_capability(serial) for serial in missing),
+            return_exceptions=True,
+        )
+        changed = False
+        for serial, result in zip(missing, results):
+            if isinstance(result, Exception) or result is None:
+                # Pas de réponse : garder l'ancienne entrée, réessayer plus tard
+                _LOGGER.debug(f"EZVIZ Enhanced: Capacités de {serial} indisponibles: {result}")
+                continue
+            code, data = result
+            capabilities = DeviceCapabilities.from_response(serial, code, data)
+            if not capabilities.valid:
+                _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Appareil {serial} inconnu ou non rattaché au compte (code {code})")
+            self.index[serial] = capabilities
+            changed = True
+
+        if changed:
+            # Le fichier est partagé entre les entrées : fusionner plutôt qu'écraser
+            stored = await self._store.async_load() or {}
+            stored.update({serial: caps.as_dict() for serial, caps in self.index.items()})
+            await self._store.async_save(stored)
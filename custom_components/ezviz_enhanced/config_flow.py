@@ -23,10 +23,33 @@ from .const import (
     CONF_APP_SECRET,
     CONF_GO2RTC_ADDON_ID,
     CONF_STREAM_QUALITY,
+    CONF_SEGMENT_BUFFER,
+    CONF_BUFFER_DURATION,
+    CONF_SNAPSHOT_TTL,
+    CONF_FRAME_EXTRACTOR,
+    CONF_EXTRACTOR_FPS,
+    CONF_DAILY_QUOTA,
+    CONF_HEDGE_REQUESTS,
+    CONF_EXTRA_APP_KEYS,
+    CONF_LL_HLS,
+    CONF_HEALTH_SAMPLER,
+    CONF_MOTION_EVENTS,
+    CONF_ALARM_INTERVAL,
     DEFAULT_RTSP_PORT,
     DEFAULT_USE_IEUOPEN,
     DEFAULT_GO2RTC_ADDON_ID,
     DEFAULT_STREAM_QUALITY,
+    DEFAULT_SEGMENT_BUFFER,
+    DEFAULT_BUFFER_DURATION,
+    DEFAULT_SNAPSHOT_TTL,
+    DEFAULT_FRAME_EXTRACTOR,
+    DEFAULT_EXTRACTOR_FPS,
+    DEFAULT_DAILY_QUOTA,
+    DEFAULT_HEDGE_REQUESTS,
+    DEFAULT_LL_HLS,
+    DEFAULT_HEALTH_SAMPLER,
+    DEFAULT_MOTION_EVENTS,
+    DEFAULT_ALARM_INTERVAL,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -268,6 +291,54 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_STREAM_QUALITY, 
                 default=current_config.get(CONF_STREAM_QUALITY, DEFAULT_STREAM_QUALITY)
             ): vol.In(["smooth", "quality", "cpu_optimized"]),
+            vol.Optional(
+                CONF_SEGMENT_BUFFER,
+                default=current_config.get(CONF_SEGMENT_BUFFER, DEFAULT_SEGMENT_BUFFER)
+            ): bool,
+            vol.Optional(
+                CONF_BUFFER_DURATION,
+                default=current_config.get(CONF_BUFFER_DURATION, DEFAULT_BUFFER_DURATION)
+            ): vol.All(int, vol.Range(min=10, max=3600)),
+            vol.Optional(
+                CONF_SNAPSHOT_TTL,
+                default=current_config.get(CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL)
+            ): vol.All(int, vol.Range(min=0, max=3600)),
+            vol.Optional(
+                CONF_FRAME_EXTRACTOR,
+                default=current_config.get(CONF_FRAME_EXTRACTOR, DEFAULT_FRAME_EXTRACTOR)
+            ): bool,
+            vol.Optional(
+                CONF_EXTRACTOR_FPS,
+                default=current_config.get(CONF_EXTRACTOR_FPS, DEFAULT_EXTRACTOR_FPS)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=5)),
+            vol.Optional(
+                CONF_DAILY_QUOTA,
+                default=current_config.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA)
+            ): vol.All(int, vol.Range(min=100)),
+            vol.Optional(
+                CONF_HEDGE_REQUESTS,
+                default=current_config.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS)
+            ): bool,
+            vol.Optional(
+                CONF_LL_HLS,
+                default=current_config.get(CONF_LL_HLS, DEFAULT_LL_HLS)
+            ): bool,
+            vol.Optional(
+                CONF_HEALTH_SAMPLER,
+                default=current_config.get(CONF_HEALTH_SAMPLER, DEFAULT_HEALTH_SAMPLER)
+            ): bool,
+            vol.Optional(
+                CONF_MOTION_EVENTS,
+                default=current_config.get(CONF_MOTION_EVENTS, DEFAULT_MOTION_EVENTS)
+            ): bool,
+            vol.Optional(
+                CONF_ALARM_INTERVAL,
+                default=current_config.get(CONF_ALARM_INTERVAL, DEFAULT_ALARM_INTERVAL)
+            ): vol.All(int, vol.Range(min=10, max=600)),
+            vol.Optional(
+                CONF_EXTRA_APP_KEYS,
+                default=current_config.get(CONF_EXTRA_APP_KEYS, "")
+            ): str,
         })
 
         return self.async_show_form(
@@ -1,6 +1,8 @@
 """Constants for EZVIZ Enhanced integration."""
 
 DOMAIN = "ezviz_enhanced"
+DATA_CLIENTS = f"{DOMAIN}_clients"  # Clients API partagés entre entrées
+DATA_WEBRTC_PROVIDER = f"{DOMAIN}_webrtc_provider"  # Désinscription du fournisseur WebRTC
 
 # Configuration keys
 CONF_USERNAME = "username"
@@ -17,12 +19,55 @@ CONF_APP_KEY = "app_key"
 CONF_APP_SECRET = "app_secret"
 CONF_GO2RTC_ADDON_ID = "go2rtc_addon_id"
 CONF_STREAM_QUALITY = "stream_quality"
+CONF_SEGMENT_BUFFER = "segment_buffer"
+CONF_BUFFER_DURATION = "buffer_duration"
+CONF_SNAPSHOT_TTL = "snapshot_ttl"
+CONF_FRAME_EXTRACTOR = "frame_extractor"
+CONF_EXTRACTOR_FPS = "extractor_fps"
+CONF_DAILY_QUOTA = "daily_quota"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_EXTRA_APP_KEYS = "extra_app_keys"
+CONF_LL_HLS = "ll_hls"
+CONF_HEALTH_SAMPLER = "health_sampler"
+CONF_MOTION_EVENTS = "motion_events"
+CONF_ALARM_INTERVAL = "alarm_interval"
 
 # Default values
 DEFAULT_RTSP_PORT = 8554
 DEFAULT_USE_IEUOPEN = True
 DEFAULT_GO2RTC_ADDON_ID = "a889bffc_go2rtc"
 DEFAULT_STREAM_QUALITY = "cpu_optimized"  # "smooth", "quality" ou "cpu_optimized"
+DEFAULT_SEGMENT_BUFFER = False
+DEFAULT_BUFFER_DURATION = 300  # Secondes conservées dans le buffer de segments
+DEFAULT_SEGMENT_DURATION = 2  # Durée d'un segment du buffer (secondes)
+DEFAULT_CLIP_WORKERS = 2  # Exports de clips simultanés
+DEFAULT_SNAPSHOT_TTL = 30  # Durée de validité d'une miniature en cache (secondes)
+DEFAULT_SNAPSHOT_MAX_CONCURRENT = 2  # Extractions de miniatures simultanées
+DEFAULT_FRAME_EXTRACTOR = False
+DEFAULT_EXTRACTOR_FPS = 0.5  # Images par seconde de l'extracteur persistant
+DEFAULT_EXTRACTOR_IDLE_TIMEOUT = 60  # Arrêt de l'extracteur sans spectateur (secondes)
+DEFAULT_DAILY_QUOTA = 10000  # Appels EZVIZ Open API autorisés par jour et par clé
+DEFAULT_API_RATE = 5  # Requêtes par seconde par clé d'application
+DEFAULT_API_BURST = 10
+DEFAULT_LIVE_RATE = 2  # Requêtes par seconde vers live/address/get
+DEFAULT_LIVE_BURST = 4
+DEFAULT_HEDGE_REQUESTS = False
+DEFAULT_HEDGE_PERCENTILE = 95  # Requête dupliquée après ce percentile de latence
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_LL_HLS = False  # Lecture LL-HLS depuis le flux local go2rtc
+DEFAULT_CAPABILITY_TTL = 7 * 86400  # Capacités des appareils conservées une semaine
+DEFAULT_INVENTORY_TTL = 300  # Liste des appareils réutilisée pendant 5 minutes
+DEFAULT_INVENTORY_PAGE_SIZE = 50  # Maximum accepté par device/list
+DEFAULT_HEALTH_SAMPLER = False  # Lecture périodique des playlists (une requête par segment)
+DEFAULT_HEALTH_PUBLISH_INTERVAL = 30  # Mise à jour maximale des capteurs de santé (secondes)
+DEFAULT_MOTION_EVENTS = False
+DEFAULT_ALARM_INTERVAL = 30  # Un appel alarm/list paginé pour tous les appareils (secondes)
+DEFAULT_ALARM_PAGE_SIZE = 50  # Maximum accepté par alarm/list
+DEFAULT_ALARM_MAX_PAGES = 20  # Pages lues au plus par cycle (rafale d'alarmes)
+DEFAULT_MOTION_HOLD = 30  # Durée à « détecté » après la dernière alarme (secondes)
+
+# Services
+SERVICE_EXPORT_CLIP = "export_clip"
 
 # EZVIZ Open Platform API endpoints (IeuOpen)
 EZVIZ_OPEN_BASE_URL = "https://open.ezvizlife.com"
@@ -30,7 +75,9 @@ EZVIZ_OPEN_API_BASE = f"{EZVIZ_OPEN_BASE_URL}/api/lapp"
 EZVIZ_OPEN_AUTH_URL = f"{EZVIZ_OPEN_API_BASE}/token/get"
 EZVIZ_OPEN_DEVICE_URL = f"{EZVIZ_OPEN_API_BASE}/device/list"
 EZVIZ_OPEN_LIVE_URL = f"{EZVIZ_OPEN_API_BASE}/live/address/get"
+EZVIZ_OPEN_LIVE_LIST_URL = f"{EZVIZ_OPEN_API_BASE}/live/video/list"
 EZVIZ_OPEN_CAPABILITY_URL = f"{EZVIZ_OPEN_API_BASE}/device/capability"
+EZVIZ_OPEN_ALARM_URL = f"{EZVIZ_OPEN_API_BASE}/alarm/list"
 EZVIZ_OPEN_LIVE_CONSOLE_URL = "https://ieuopen.ezviz.com/console/setnormallive.html"
 
 # EZVIZ Cloud API endpoints
@@ -57,4 +104,27 @@ ATTR_RTSP_URL = "rtsp_url"
 ATTR_HLS_URL = "hls_url"
 ATTR_IEUOPEN_URL = "ieuopen_url"
 ATTR_CLOUD_URL = "cloud_url"
-ATTR_ACCESS_TOKEN = "access_token"
\ No newline at end of file
+ATTR_ACCESS_TOKEN = "access_token"
+ATTR_SNAPSHOT_HITS = "snapshot_cache_hits"
+ATTR_SNAPSHOT_MISSES = "snapshot_cache_misses"
+ATTR_SNAPSHOT_LATENCY = "snapshot_latency_ms"
+ATTR_STREAM_SOURCE = "stream_source_type"
+ATTR_QUOTA_USED = "quota_used_today"
+ATTR_QUOTA_LIMIT = "daily_quota"
+ATTR_THROTTLED = "throttled_requests"
+ATTR_REFRESH_P50 = "refresh_latency_p50_ms"
+ATTR_REFRESH_P99 = "refresh_latency_p99_ms"
+ATTR_LIVE_P95 = "live_address_latency_p95_ms"
+ATTR_HEDGED = "hedged_requests"
+ATTR_APP_KEYS = "app_keys"
+ATTR_SPILLOVERS = "key_spillovers"
+ATTR_HEALTH_SAMPLES = "playlist_samples"
+ATTR_HEALTH_ERRORS = "playlist_errors"
+ATTR_ALARM_ID = "alarm_id"
+ATTR_ALARM_TYPE = "alarm_type"
+ATTR_ALARM_NAME = "alarm_name"
+ATTR_ALARM_TIME = "alarm_time"
+ATTR_ALARM_PICTURE = "alarm_picture_url"
+
+# Events
+EVENT_ALARM = f"{DOMAIN}_alarm"
\ No newline at end of file
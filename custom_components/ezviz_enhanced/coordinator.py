@@ -1,20 +1,48 @@
 """Data update coordinator for EZVIZ Enhanced integration."""
 import logging
+import os
 import re
+import tempfile
+import time
 from datetime import timedelta, datetime
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import EzvizApi, EzvizOpenApi, StreamConverter
-from .const import DOMAIN, CONF_USE_IEUOPEN, CONF_RTSP_PORT, CONF_CAMERAS, CONF_GO2RTC_ADDON_ID, CONF_STREAM_QUALITY
+from .api import EzvizApi, EzvizOpenApi, StreamConverter, PROTOCOLS_TO_TRY
+from .const import (
+    DOMAIN, CONF_USE_IEUOPEN, CONF_RTSP_PORT, CONF_CAMERAS, CONF_GO2RTC_ADDON_ID, CONF_STREAM_QUALITY,
+    CONF_SEGMENT_BUFFER, CONF_BUFFER_DURATION, DEFAULT_SEGMENT_BUFFER, DEFAULT_BUFFER_DURATION,
+    DEFAULT_SEGMENT_DURATION, DEFAULT_CLIP_WORKERS,
+    CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_MAX_CONCURRENT,
+    CONF_FRAME_EXTRACTOR, CONF_EXTRACTOR_FPS, DEFAULT_FRAME_EXTRACTOR, DEFAULT_EXTRACTOR_FPS,
+    DEFAULT_EXTRACTOR_IDLE_TIMEOUT, CONF_LL_HLS, DEFAULT_LL_HLS, CONF_HEALTH_SAMPLER, DEFAULT_HEALTH_SAMPLER,
+    CONF_MOTION_EVENTS, DEFAULT_MOTION_EVENTS, CONF_ALARM_INTERVAL, DEFAULT_ALARM_INTERVAL,
+)
+from .alarm import AlarmIngestor
+from .capability import CapabilityStore
 from .go2rtc_manager import Go2RtcManager
+from .health import StreamHealthMonitor
+from .inventory import DeviceInventory
+from .keypool import AppKeyPool
+from .models import CameraState, camera_key
+from .ratelimit import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from .resilience import LatencyTracker
+from .segment_buffer import SegmentBuffer, ClipExporter
+from .hls import is_hls_url, async_validate_playlist
+from .snapshot import SnapshotCache, FrameExtractor
+from .stream_selector import (
+    StreamSourceSelector, SOURCE_CLOUD_HLS, SOURCE_CLOUD_FLV, SOURCE_GO2RTC_RTSP, SOURCE_GO2RTC_HLS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = timedelta(minutes=1)  # Vérification légère toutes les 1 minute
+REJECTION_BACKOFF = 120  # Attente avant de renégocier une caméra dont les URLs sont rejetées (secondes)
+REJECTION_BACKOFF_MAX = 1800
 
 
 class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
@@ -26,10 +54,13 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
         ezviz_api: EzvizApi,
         ezviz_open_api: Optional[EzvizOpenApi],
         config_data: Dict[str, Any],
+        api_pool: Optional[AppKeyPool] = None,
     ):
         """Initialize coordinator."""
         self.ezviz_api = ezviz_api
         self.ezviz_open_api = ezviz_open_api
+        # Clés supplémentaires : les caméras sont réparties entre les clés du pool
+        self.api_pool = api_pool
         self.config_data = config_data
         self.use_ieuopen = config_data.get(CONF_USE_IEUOPEN, True)
         self.rtsp_port = config_data.get(CONF_RTSP_PORT, 8554)
@@ -43,11 +74,73 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
         stream_quality = config_data.get(CONF_STREAM_QUALITY, "cpu_optimized")
         self.go2rtc_manager = Go2RtcManager(hass, go2rtc_addon_id, stream_quality)
         
-        # Store camera data
-        self.cameras: Dict[str, Dict[str, Any]] = {}
-        self.stream_urls: Dict[str, str] = {}
-        self.rtsp_urls: Dict[str, str] = {}  # URLs RTSP locales via go2rtc
-        self.url_expiration: Dict[str, int] = {}  # Stocke les timestamps d'expiration
+        # Buffer de segments par caméra (export de clips sans re-téléchargement)
+        self.segment_buffer_enabled = config_data.get(CONF_SEGMENT_BUFFER, DEFAULT_SEGMENT_BUFFER)
+        self.buffer_duration = config_data.get(CONF_BUFFER_DURATION, DEFAULT_BUFFER_DURATION)
+        self.buffer_dir = os.path.join(tempfile.gettempdir(), DOMAIN)
+        self.segment_buffers: Dict[str, SegmentBuffer] = {}
+        self.clip_exporter = ClipExporter(hass, DEFAULT_CLIP_WORKERS)
+        
+        # Cache des miniatures partagé par les entités caméra
+        self.snapshot_cache = SnapshotCache(
+            config_data.get(CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL),
+            DEFAULT_SNAPSHOT_MAX_CONCURRENT,
+        )
+        
+        # Extracteurs de frames persistants (démarrés à la demande)
+        self.frame_extractor_enabled = config_data.get(CONF_FRAME_EXTRACTOR, DEFAULT_FRAME_EXTRACTOR)
+        self.extractor_fps = config_data.get(CONF_EXTRACTOR_FPS, DEFAULT_EXTRACTOR_FPS)
+        self.frame_extractors: Dict[str, FrameExtractor] = {}
+        
+        # Mode LL-HLS : le worker stream de HA lit le flux local go2rtc
+        self.ll_hls_enabled = config_data.get(CONF_LL_HLS, DEFAULT_LL_HLS)
+        
+        # Santé des flux live (gigue, débit, retard, expiration) mesurée sur les playlists
+        self.health_monitor: Optional[StreamHealthMonitor] = None
+        if config_data.get(CONF_HEALTH_SAMPLER, DEFAULT_HEALTH_SAMPLER):
+            self.health_monitor = StreamHealthMonitor(hass)
+        
+        # Sélection de la source de stream la plus rapide par caméra
+        self.source_selector = StreamSourceSelector(hass)
+        
+        # Un enregistrement partagé par caméra (URLs, expiration, drapeaux)
+        self.cameras: Dict[str, CameraState] = {}
+        
+        # Capacités des appareils (protocoles, qualités, canaux), mises en cache dans le stockage HA
+        self.capability_store: Optional[CapabilityStore] = None
+        if ezviz_open_api:
+            self.capability_store = CapabilityStore(hass, ezviz_open_api)
+        
+        if api_pool:
+            # Les clés du pool voient les mêmes appareils : un seul index de capacités
+            for client in api_pool.clients:
+                if client is not ezviz_open_api and not client.capabilities:
+                    client.capabilities = ezviz_open_api.capabilities
+        
+        # Inventaire des appareils (device/list paginé, mis en cache)
+        self.inventory: Optional[DeviceInventory] = DeviceInventory(ezviz_open_api) if ezviz_open_api else None
+        
+        # Alarmes de tous les appareils en un appel paginé par intervalle (détection de mouvement)
+        self.alarm_ingestor: Optional[AlarmIngestor] = None
+        if ezviz_open_api and config_data.get(CONF_MOTION_EVENTS, DEFAULT_MOTION_EVENTS):
+            self.alarm_ingestor = AlarmIngestor(
+                hass,
+                self._account_client,
+                ezviz_open_api.app_key,
+                config_data.get(CONF_ALARM_INTERVAL, DEFAULT_ALARM_INTERVAL),
+            )
+        
+        # Durée de renouvellement par appareil (p50/p99 exposés par un capteur)
+        self.refresh_latency = LatencyTracker()
+        
+        # Notifications par caméra : seules les caméras modifiées réveillent leurs entités
+        self._camera_listeners: Dict[str, List[CALLBACK_TYPE]] = {}
+        self._camera_fingerprints: Dict[str, int] = {}
+        self._remove_dispatch_listener: Optional[CALLBACK_TYPE] = None
+        self._last_available: Optional[bool] = None
+        
+        # Caméras dont aucune URL n'a passé la validation : (échecs consécutifs, prochain essai)
+        self._rejections: Dict[str, Tuple[int, float]] = {}
 
         super().__init__(
             hass,
@@ -56,6 +149,18 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=UPDATE_INTERVAL,
         )
     
+    def _client_for(self, serial: str) -> EzvizOpenApi:
+        """Return the Open API client serving a device."""
+        if self.api_pool:
+            return self.api_pool.client_for(serial)
+        return self.ezviz_open_api
+
+    def _account_client(self) -> EzvizOpenApi:
+        """Return the Open API client serving an account-wide call."""
+        if self.api_pool:
+            return self.api_pool.client_for_account()
+        return self.ezviz_open_api
+
     def _extract_expiration_from_url(self, url: str) -> Optional[int]:
         """Extraire le timestamp d'expiration de l'URL HLS."""
         try:
@@ -67,12 +172,27 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.debug(f"Impossible d'extraire l'expiration de l'URL: {e}")
         return None
     
+    def _parse_expire_time(self, expire_time: Any) -> Optional[int]:
+        """Parse an expireTime field (timestamp in s/ms or date string)."""
+        if expire_time is None:
+            return None
+        try:
+            value = int(expire_time)
+            return value // 1000 if value > 10**12 else value
+        except (TypeError, ValueError):
+            pass
+        try:
+            return int(datetime.strptime(str(expire_time), "%Y-%m-%d %H:%M:%S").timestamp())
+        except ValueError:
+            return None
+    
     def _is_url_expired(self, serial: str, buffer_seconds: int = 300) -> bool:
         """Vérifier si l'URL est expirée ou proche de l'expiration (5 min de marge)."""
-        if serial not in self.url_expiration:
+        camera = self.cameras.get(serial)
+        if camera is None or not camera.expires_at:
             return True
         
-        expiration = self.url_expiration[serial]
+        expiration = camera.expires_at
         now = int(datetime.now().timestamp())
         
         # Considérer comme expiré si moins de 5 minutes restantes
@@ -83,111 +203,384 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
         _LOGGER.debug(f"URL pour {serial} encore valide pour {expiration - now}s")
         return False
 
+    @callback
+    def async_add_camera_listener(self, serial: str, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for changes of a single camera."""
+        listeners = self._camera_listeners.setdefault(serial, [])
+        listeners.append(update_callback)
+        
+        # Un seul listener global maintient le rafraîchissement planifié du coordinator
+        if self._remove_dispatch_listener is None:
+            self._remove_dispatch_listener = self.async_add_listener(self._async_dispatch_camera_updates)
+        
+        @callback
+        def remove_listener() -> None:
+            """Remove the camera listener."""
+            listeners.remove(update_callback)
+            if not listeners:
+                self._camera_listeners.pop(serial, None)
+            if not self._camera_listeners and self._remove_dispatch_listener:
+                self._remove_dispatch_listener()
+                self._remove_dispatch_listener = None
+        
+        return remove_listener
+
+    @callback
+    def _async_dispatch_camera_updates(self) -> None:
+        """Notify only the listeners of cameras whose record changed."""
+        available = self.last_update_success
+        availability_changed = available != self._last_available
+        self._last_available = available
+        
+        for serial, listeners in list(self._camera_listeners.items()):
+            camera = self.cameras.get(serial)
+            fingerprint = camera.fingerprint() if camera else 0
+            if not availability_changed and self._camera_fingerprints.get(serial) == fingerprint:
+                continue
+            self._camera_fingerprints[serial] = fingerprint
+            if camera:
+                camera.version += 1
+            for update_callback in list(listeners):
+                update_callback()
+
+    def get_camera_version(self, serial: str) -> int:
+        """Return the change counter of a camera record."""
+        camera = self.cameras.get(serial)
+        return camera.version if camera else 0
+
     async def _async_update_data(self) -> Dict[str, Any]:
         """Update data via library."""
         try:
-            # Get devices from EZVIZ cloud API
-            ezviz_devices = await self.ezviz_api.async_get_devices()
+            # Liste des appareils : un appel groupé, réutilisé tant qu'il est frais
+            if self.inventory:
+                inventory_diff = await self.inventory.async_refresh()
+                for serial in inventory_diff.removed:
+                    _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Appareil {serial} retiré du compte EZVIZ")
+                ezviz_devices = self.inventory.as_list()
+            else:
+                ezviz_devices = await self.ezviz_api.async_get_devices()
+            
+            # Capacités connues avant toute demande d'adresse live (une fois par appareil)
+            if self.capability_store and self.use_ieuopen:
+                await self.capability_store.async_ensure(
+                    camera_config["serial"] for camera_config in self.cameras_config
+                    if camera_config.get("serial") and camera_config.get("enabled", True)
+                )
             
             # Process each configured camera
+            to_refresh: Dict[str, List[CameraState]] = {}
             for camera_config in self.cameras_config:
                 serial = camera_config.get("serial")
                 channel = camera_config.get("channel", 1)
                 name = camera_config.get("name", f"EZVIZ {serial}")
                 enabled = camera_config.get("enabled", True)
                 
-                if not serial or not enabled:
+                if not serial:
                     continue
                 
-                camera_data = {
-                    "serial": serial,
-                    "channel": channel,
-                    "name": name,
-                    "enabled": enabled,
-                    "device_type": "camera",
-                }
+                key = camera_key(serial, channel)
+                camera = self.cameras.get(key)
+                if camera is None:
+                    camera = CameraState(serial, channel, name, enabled)
+                    self.cameras[key] = camera
+                camera.name = name
+                camera.enabled = enabled
                 
-                # Get stream information from EZVIZ Open Platform if enabled
-                if self.use_ieuopen and self.ezviz_open_api:
-                    # Vérifier si l'URL actuelle est encore valide
-                    need_refresh = self._is_url_expired(serial)
-                    
-                    if need_refresh:
-                        _LOGGER.info(f"🔄 Rafraîchissement de l'URL pour {serial} (expirée ou proche expiration)")
-                        stream_info = await self.ezviz_open_api.async_get_stream_info(serial, channel)
-                        if stream_info:
-                            camera_data.update(stream_info)
-                            
-                            # Get the best available stream URL
-                            stream_url = None
-                            stream_type = stream_info.get("stream_type", "hls_fluent")
-                            
-                            if stream_info.get("hls_url"):
-                                stream_url = stream_info["hls_url"]
-                            elif stream_info.get("flv_url"):
-                                stream_url = stream_info["flv_url"]
-                            elif stream_info.get("cloud_url"):
-                                stream_url = stream_info["cloud_url"]
-                            
-                            if stream_url:
-                                # Extraire et stocker la date d'expiration
-                                expiration = self._extract_expiration_from_url(stream_url)
-                                if expiration:
-                                    self.url_expiration[serial] = expiration
-                                    remaining = expiration - int(datetime.now().timestamp())
-                                    _LOGGER.info(f"✅ Nouvelle URL HLS pour {serial}, valide pour {remaining}s (~{remaining//60} min)")
-                                
-                                # For HLS streams, use direct URL (Home Assistant can handle it)
-                                if stream_type.startswith("hls"):
-                                    camera_data["stream_url"] = stream_url
-                                    self.stream_urls[serial] = stream_url
-                                    camera_data["hls_url"] = stream_url
-                                    
-                                    # Mettre à jour go2rtc configuration automatiquement
-                                    _LOGGER.info(f"🔄 Mise à jour go2rtc pour {serial} avec nouvelle URL HLS")
-                                    if self.go2rtc_manager.is_available:
-                                        _LOGGER.info(f"✅ go2rtc_manager disponible, mise à jour du stream...")
-                                        rtsp_url = await self.go2rtc_manager.async_add_stream(serial, stream_url)
-                                        if rtsp_url:
-                                            camera_data["rtsp_local_url"] = rtsp_url
-                                            self.rtsp_urls[serial] = rtsp_url
-                                            _LOGGER.info(f"✅ go2rtc mis à jour : {rtsp_url}")
-                                        else:
-                                            _LOGGER.warning(f"⚠️ Échec mise à jour go2rtc pour {serial}")
-                                    else:
-                                        _LOGGER.warning(f"⚠️ go2rtc_manager non disponible pour {serial}")
-                            else:
-                                # For other formats, convert to RTSP
-                                rtsp_url = await self.stream_converter.start_rtsp_conversion(
-                                    serial, stream_url, stream_type
-                                )
-                                camera_data["stream_url"] = rtsp_url
-                                self.stream_urls[serial] = rtsp_url
-                    else:
-                        # URL encore valide, utiliser le cache
-                        if serial in self.stream_urls:
-                            camera_data["stream_url"] = self.stream_urls[serial]
-                            camera_data["hls_url"] = self.stream_urls[serial]
-                        if serial in self.rtsp_urls:
-                            camera_data["rtsp_local_url"] = self.rtsp_urls[serial]
+                # Caméra désactivée : gardée dans l'état (interrupteur), sans renouvellement
+                if not enabled:
+                    continue
                 
                 # Add EZVIZ Open Platform URL
                 if self.ezviz_open_api:
-                    camera_data["ieuopen_url"] = self.ezviz_open_api.get_live_url(serial, channel)
+                    camera.ieuopen_url = self.ezviz_open_api.get_live_url(serial, channel)
                 
-                self.cameras[serial] = camera_data
+                # Vérifier si l'URL actuelle est encore valide
+                if (
+                    self.use_ieuopen and self.ezviz_open_api
+                    and self._is_url_expired(key) and not self._is_backing_off(key)
+                ):
+                    _LOGGER.info(f"🔄 Rafraîchissement de l'URL pour {key} (expirée ou proche expiration)")
+                    # Regrouper les canaux d'un même appareil (NVR)
+                    to_refresh.setdefault(serial, []).append(camera)
+            
+            # Get stream information from EZVIZ Open Platform, one batch per device
+            for serial, cameras in to_refresh.items():
+                started = time.monotonic()
+                stream_infos = await self._client_for(serial).async_get_stream_infos(
+                    serial, [camera.channel for camera in cameras]
+                )
+                self.refresh_latency.record("refresh", time.monotonic() - started)
+                for camera in cameras:
+                    stream_info = stream_infos.get(camera.channel)
+                    if stream_info:
+                        await self._async_apply_stream_info(camera, stream_info)
+                    else:
+                        self._record_rejection(camera.key)
+            
+            # État en ligne donné par l'inventaire plutôt que par la négociation des flux
+            if self.inventory:
+                for camera in self.cameras.values():
+                    online = self.inventory.get_online(camera.serial)
+                    if online is not None:
+                        camera.online = online
+            
+            if self.segment_buffer_enabled:
+                for key, camera in self.cameras.items():
+                    if camera.enabled:
+                        await self._async_update_segment_buffer(key)
+            
+            if self.health_monitor:
+                for key, camera in self.cameras.items():
+                    if camera.enabled and is_hls_url(camera.hls_url):
+                        self.health_monitor.track(camera)
+                    else:
+                        await self.health_monitor.async_untrack(key)
             
             return {
                 "cameras": self.cameras,
-                "stream_urls": self.stream_urls,
-                "rtsp_urls": self.rtsp_urls,
                 "ezviz_devices": ezviz_devices,
             }
             
         except Exception as error:
             raise UpdateFailed(f"Error communicating with EZVIZ API: {error}")
 
-    async def async_get_camera(self, serial: str) -> Optional[Dict[str, Any]]:
+    async def _async_apply_stream_info(self, camera: CameraState, stream_info: Dict[str, Any]):
+        """Store a freshly negotiated stream and publish it locally."""
+        serial = camera.key
+        stream_info = await self._async_validate_stream_info(camera, stream_info)
+        if not stream_info:
+            return
+        camera.apply_stream_info(stream_info)
+        
+        # Get the best available stream URL
+        stream_type = stream_info.get("stream_type", "hls_fluent")
+        stream_url = camera.hls_url or camera.flv_url or camera.cloud_url
+        if not stream_url:
+            return
+        
+        # Extraire et stocker la date d'expiration
+        expiration = self._extract_expiration_from_url(stream_url) or self._parse_expire_time(
+            stream_info.get("expire_time")
+        )
+        if expiration:
+            camera.expires_at = expiration
+            remaining = expiration - int(datetime.now().timestamp())
+            _LOGGER.info(f"✅ Nouvelle URL HLS pour {serial}, valide pour {remaining}s (~{remaining//60} min)")
+        
+        # For HLS streams, use direct URL (Home Assistant can handle it)
+        if stream_type.startswith("hls"):
+            camera.stream_url = stream_url
+            camera.hls_url = stream_url
+            camera.converted = False
+            
+            # Mettre à jour go2rtc configuration automatiquement
+            _LOGGER.info(f"🔄 Mise à jour go2rtc pour {serial} avec nouvelle URL HLS")
+            if self.go2rtc_manager.is_available:
+                _LOGGER.info(f"✅ go2rtc_manager disponible, mise à jour du stream...")
+                rtsp_url = await self.go2rtc_manager.async_add_stream(serial, stream_url)
+                if rtsp_url:
+                    camera.rtsp_local_url = rtsp_url
+                    _LOGGER.info(f"✅ go2rtc mis à jour : {rtsp_url}")
+                else:
+                    _LOGGER.warning(f"⚠️ Échec mise à jour go2rtc pour {serial}")
+            else:
+                _LOGGER.warning(f"⚠️ go2rtc_manager non disponible pour {serial}")
+        else:
+            # For other formats, convert to RTSP
+            camera.stream_url = await self.stream_converter.start_rtsp_conversion(
+                serial, stream_url, stream_type
+            )
+            camera.converted = True
+
+    def _is_backing_off(self, serial: str) -> bool:
+        """Return true while a camera whose URLs were rejected waits before renegotiating."""
+        rejection = self._rejections.get(serial)
+        return rejection is not None and time.monotonic() < rejection[1]
+
+    def _record_rejection(self, serial: str):
+        """Delay the next renegotiation of a camera, doubling on each consecutive failure."""
+        failures = self._rejections.get(serial, (0, 0))[0] + 1
+        delay = min(REJECTION_BACKOFF * 2 ** (failures - 1), REJECTION_BACKOFF_MAX)
+        self._rejections[serial] = (failures, time.monotonic() + delay)
+        _LOGGER.info(f"⏸️ EZVIZ Enhanced: Aucune URL valide pour {serial}, nouvel essai dans {delay}s")
+
+    async def _async_validate_stream_info(
+        self, camera: CameraState, stream_info: Dict[str, Any], priority: int = PRIORITY_BACKGROUND
+    ) -> Optional[Dict[str, Any]]:
+        """Return a stream whose playlist answers, renegotiating other variants on failure."""
+        session = async_get_clientsession(self.hass)
+        client = self._client_for(camera.serial)
+        for _attempt in range(len(PROTOCOLS_TO_TRY)):
+            url = stream_info.get("hls_url")
+            if not is_hls_url(url):
+                # Seules les playlists HLS sont validées (FLV passe par la conversion)
+                self._rejections.pop(camera.key, None)
+                return stream_info
+            reason = await async_validate_playlist(session, url)
+            if reason is None:
+                self._rejections.pop(camera.key, None)
+                return stream_info
+            
+            _LOGGER.warning(
+                f"⚠️ EZVIZ Enhanced: URL {stream_info.get('stream_type')} de {camera.key} rejetée ({reason}), "
+                "pas de publication go2rtc"
+            )
+            client.mark_variant_failed(camera.serial, stream_info.get("protocol"), stream_info.get("quality"))
+            stream_info = await client.async_get_stream_info(camera.serial, camera.channel, priority)
+            if not stream_info:
+                break
+        self._record_rejection(camera.key)
+        return None
+
+    def _local_source_url(self, serial: str) -> Optional[str]:
+        """Return the go2rtc restream if any, the stream URL otherwise."""
+        camera = self.cameras.get(serial)
+        if camera is None:
+            return None
+        return camera.rtsp_local_url or camera.stream_url
+
+    async def _async_update_segment_buffer(self, serial: str):
+        """Start or retarget the segment buffer of a camera."""
+        # Préférer le flux local go2rtc pour ne pas tirer un second flux cloud
+        source_url = self._local_source_url(serial)
+        if not source_url:
+            return
+        
+        buffer = self.segment_buffers.get(serial)
+        if buffer is None:
+            buffer = SegmentBuffer(
+                self.hass, serial, self.buffer_dir, DEFAULT_SEGMENT_DURATION, self.buffer_duration
+            )
+            self.segment_buffers[serial] = buffer
+        await buffer.async_start(source_url)
+
+    def get_segment_buffer(self, serial: str) -> Optional[SegmentBuffer]:
+        """Get the segment buffer of a camera."""
+        return self.segment_buffers.get(serial)
+
+    async def async_export_clip(
+        self, serial: str, start: float, end: float, output_path: str
+    ) -> Optional[str]:
+        """Export a clip from the buffered segments of a camera."""
+        buffer = self.segment_buffers.get(serial)
+        if buffer is None:
+            _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Pas de buffer de segments pour {serial}")
+            return None
+        return await self.clip_exporter.async_export(buffer, start, end, output_path)
+
+    async def async_stop_segment_buffers(self):
+        """Stop every segment buffer and drop buffered segments."""
+        for buffer in self.segment_buffers.values():
+            await buffer.async_stop()
+            await self.hass.async_add_executor_job(buffer.clear)
+        self.segment_buffers.clear()
+
+    async def async_get_live_frame(self, serial: str) -> Optional[bytes]:
+        """Return the latest frame of the persistent extractor, starting it on demand."""
+        camera = self.cameras.get(serial)
+        if camera is None or not camera.enabled:
+            return None
+        source_url = self._local_source_url(serial)
+        if not source_url:
+            return None
+        
+        extractor = self.frame_extractors.get(serial)
+        if extractor is None:
+            extractor = FrameExtractor(serial, self.extractor_fps, DEFAULT_EXTRACTOR_IDLE_TIMEOUT)
+            self.frame_extractors[serial] = extractor
+        await extractor.async_start(source_url)
+        return extractor.latest_frame
+
+    async def async_stop_frame_extractors(self):
+        """Stop every persistent frame extractor."""
+        for extractor in self.frame_extractors.values():
+            await extractor.async_stop()
+        self.frame_extractors.clear()
+
+    async def async_release_resources(self):
+        """Stop background work (buffers, extractors, health samplers, alarm polling) on unload."""
+        await self.async_stop_segment_buffers()
+        await self.async_stop_frame_extractors()
+        if self.health_monitor:
+            await self.health_monitor.async_stop()
+        if self.alarm_ingestor:
+            await self.alarm_ingestor.async_stop()
+
+    async def async_release_camera(self, serial: str):
+        """Stop every local resource of a camera and forget its stream URLs."""
+        camera = self.cameras.get(serial)
+        if camera is None:
+            return
+        
+        await self.async_stop_rtsp_conversion(serial)
+        if self.health_monitor:
+            await self.health_monitor.async_untrack(serial)
+        if camera.rtsp_local_url:
+            await self.go2rtc_manager.async_remove_stream(serial)
+        
+        extractor = self.frame_extractors.pop(serial, None)
+        if extractor:
+            await extractor.async_stop()
+        buffer = self.segment_buffers.pop(serial, None)
+        if buffer:
+            await buffer.async_stop()
+            await self.hass.async_add_executor_job(buffer.clear)
+        
+        # URL expirée : un renouvellement complet sera fait à la réactivation
+        camera.stream_url = None
+        camera.hls_url = None
+        camera.flv_url = None
+        camera.cloud_url = None
+        camera.rtsp_local_url = None
+        camera.converted = False
+        camera.expires_at = 0
+
+    async def async_set_camera_enabled(self, config_entry, serial: str, enabled: bool):
+        """Enable or disable a camera without reloading the integration."""
+        camera = self.cameras.get(serial)
+        if camera is None or camera.enabled == enabled:
+            return
+        camera.enabled = enabled
+        
+        # Persister l'état dans la configuration des caméras (pas de rechargement)
+        cameras_config = []
+        for camera_config in self.cameras_config:
+            if camera_key(camera_config.get("serial"), camera_config.get("channel", 1)) == serial:
+                camera_config = {**camera_config, "enabled": enabled}
+            cameras_config.append(camera_config)
+        self.cameras_config = cameras_config
+        self.hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_CAMERAS: cameras_config}
+        )
+        
+        if enabled:
+            _LOGGER.info(f"▶️ EZVIZ Enhanced: Caméra {serial} réactivée")
+            # Renégociation en arrière-plan : l'interrupteur répond immédiatement
+            self.hass.async_create_background_task(
+                self._async_resume_camera(camera), f"{DOMAIN}_resume_{serial}"
+            )
+        else:
+            _LOGGER.info(f"⏹️ EZVIZ Enhanced: Caméra {serial} désactivée, ressources libérées")
+            await self.async_release_camera(serial)
+        self._async_dispatch_camera_updates()
+
+    async def _async_resume_camera(self, camera: CameraState):
+        """Negotiate and publish the stream of a re-enabled camera."""
+        if self.use_ieuopen and self.ezviz_open_api:
+            stream_infos = await self._client_for(camera.serial).async_get_stream_infos(
+                camera.serial, [camera.channel]
+            )
+            stream_info = stream_infos.get(camera.channel)
+            if stream_info and camera.enabled:
+                await self._async_apply_stream_info(camera, stream_info)
+        
+        if self.segment_buffer_enabled and camera.enabled:
+            await self._async_update_segment_buffer(camera.key)
+        if self.health_monitor and camera.enabled and is_hls_url(camera.hls_url):
+            self.health_monitor.track(camera)
+        self._async_dispatch_camera_updates()
+
+    async def async_get_camera(self, serial: str) -> Optional[CameraState]:
         """Get camera data by serial."""
         return self.cameras.get(serial)
 
@@ -195,28 +588,38 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
         """Get stream URL for a camera."""
         _LOGGER.debug(f"EZVIZ Coordinator: Demande d'URL pour {serial}, force_refresh={force_refresh}")
         
+        camera = self.cameras.get(serial)
+        if camera is None:
+            _LOGGER.warning(f"EZVIZ Coordinator: Aucune URL disponible pour {serial}")
+            return None
+        if not camera.enabled:
+            # Caméra coupée par l'interrupteur : ne pas relancer de flux cloud
+            return None
+        
         # Force refresh if requested or if URL is not available
-        if force_refresh or serial not in self.stream_urls:
+        if force_refresh or not camera.stream_url:
             _LOGGER.debug(f"EZVIZ Coordinator: Rafraîchissement de l'URL pour {serial}")
             
             if self.ezviz_open_api:
-                camera = self.cameras.get(serial)
-                if camera:
-                    channel = camera.get("channel", 1)
-                    stream_info = await self.ezviz_open_api.async_get_stream_info(serial, channel)
+                # Un spectateur attend : passer devant les renouvellements en arrière-plan
+                stream_info = await self._client_for(camera.serial).async_get_stream_info(
+                    camera.serial, camera.channel, PRIORITY_INTERACTIVE
+                )
+                if stream_info:
+                    # Même validation que les renouvellements : pas d'URL morte servie au spectateur
+                    stream_info = await self._async_validate_stream_info(camera, stream_info, PRIORITY_INTERACTIVE)
+                
+                if stream_info and stream_info.get("hls_url"):
+                    _LOGGER.debug(f"EZVIZ Coordinator: Nouvelle URL HLS obtenue pour {serial}")
                     
-                    if stream_info and stream_info.get("hls_url"):
-                        self.stream_urls[serial] = stream_info["hls_url"]
-                        _LOGGER.debug(f"EZVIZ Coordinator: Nouvelle URL HLS obtenue pour {serial}")
-                        
-                        # Update camera data with new URL
-                        camera["hls_url"] = stream_info["hls_url"]
-                        camera["stream_url"] = stream_info["hls_url"]
-                        self.cameras[serial] = camera
-                    else:
-                        _LOGGER.warning(f"EZVIZ Coordinator: Échec de récupération de l'URL HLS pour {serial}")
+                    # Update camera data with new URL
+                    camera.apply_stream_info(stream_info)
+                    camera.stream_url = stream_info["hls_url"]
+                    camera.converted = False
+                else:
+                    _LOGGER.warning(f"EZVIZ Coordinator: Échec de récupération de l'URL HLS pour {serial}")
         
-        url = self.stream_urls.get(serial)
+        url = camera.stream_url
         if url:
             _LOGGER.debug(f"EZVIZ Coordinator: URL retournée pour {serial}")
         else:
@@ -231,18 +634,47 @@ class EzvizDataUpdateCoordinator(DataUpdateCoordinator):
     async def async_cleanup(self):
         """Cleanup resources."""
         # Stop all RTSP conversions
-        for serial in list(self.stream_urls.keys()):
+        for serial in list(self.cameras):
             await self.async_stop_rtsp_conversion(serial)
         
+        await self.async_release_resources()
+        
         # Remove all go2rtc streams
-        for serial in list(self.rtsp_urls.keys()):
-            await self.go2rtc_manager.async_remove_stream(serial)
+        for serial, camera in self.cameras.items():
+            if camera.rtsp_local_url:
+                await self.go2rtc_manager.async_remove_stream(serial)
         
-        # Close API sessions
+        # Close API sessions (le client Open API partagé est fermé par le registre)
         await self.ezviz_api.async_close()
-        if self.ezviz_open_api:
-            await self.ezviz_open_api.async_close()
     
     def get_rtsp_local_url(self, serial: str) -> Optional[str]:
         """Get local RTSP URL for a camera."""
-        return self.rtsp_urls.get(serial)
+        camera = self.cameras.get(serial)
+        return camera.rtsp_local_url if camera else None
+    
+    def get_stream_candidates(self, serial: str) -> Dict[str, str]:
+        """Get every candidate stream source of a camera."""
+        candidates = {}
+        camera = self.cameras.get(serial)
+        if camera is None:
+            return candidates
+        
+        stream_url = camera.stream_url
+        if is_hls_url(stream_url):
+            candidates[SOURCE_CLOUD_HLS] = stream_url
+        
+        if camera.flv_url:
+            candidates[SOURCE_CLOUD_FLV] = camera.flv_url
+        
+        rtsp_url = camera.rtsp_local_url
+        if rtsp_url:
+            candidates[SOURCE_GO2RTC_RTSP] = rtsp_url
+            hls_url = self.go2rtc_manager.get_hls_url(serial)
+            if hls_url:
+                candidates[SOURCE_GO2RTC_HLS] = hls_url
+        
+        # Flux converti en RTSP (formats non HLS)
+        if not candidates and stream_url:
+            candidates[SOURCE_CLOUD_HLS] = stream_url
+        
+        return candidates
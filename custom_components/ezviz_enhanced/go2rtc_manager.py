@@ -5,6 +5,8 @@ from typing import Optional, Dict
 import os
 import aiohttp
 
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -366,6 +368,63 @@ class Go2RtcManager:
             _LOGGER.error(f"🔴 EZVIZ Enhanced: Erreur lors de la suppression du stream: {e}")
             return False
 
+    async def async_get_frame(
+        self, serial: str, width: Optional[int] = None, timeout: float = 5
+    ) -> Optional[bytes]:
+        """Get a JPEG frame of a stream from the go2rtc frame API."""
+        if serial not in self._streams:
+            return None
+        
+        params = {"src": f"ezviz_{serial}"}
+        if width:
+            # go2rtc redimensionne lui-même l'image
+            params["width"] = str(width)
+        
+        session = async_get_clientsession(self.hass)
+        try:
+            async with session.get(
+                f"{self._go2rtc_url}/api/frame.jpeg",
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 200:
+                    return await response.read()
+                _LOGGER.debug(f"EZVIZ Enhanced: go2rtc frame API HTTP {response.status} pour {serial}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.debug(f"EZVIZ Enhanced: go2rtc frame API indisponible pour {serial}: {e}")
+        return None
+
+    def has_stream(self, serial: str) -> bool:
+        """Return true if go2rtc holds a stream for a camera."""
+        return serial in self._streams
+
+    async def async_webrtc_offer(self, serial: str, offer_sdp: str, timeout: float = 10) -> Optional[str]:
+        """Send a WebRTC SDP offer to go2rtc and return its SDP answer."""
+        if serial not in self._streams:
+            return None
+        
+        session = async_get_clientsession(self.hass)
+        try:
+            async with session.post(
+                f"{self._go2rtc_url}/api/webrtc",
+                params={"src": f"ezviz_{serial}"},
+                data=offer_sdp,
+                headers={"Content-Type": "application/sdp"},
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status in (200, 201):
+                    return await response.text()
+                _LOGGER.warning(f"⚠️ EZVIZ Enhanced: go2rtc WebRTC HTTP {response.status} pour {serial}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.warning(f"⚠️ EZVIZ Enhanced: go2rtc WebRTC indisponible pour {serial}: {e}")
+        return None
+
+    def get_hls_url(self, serial: str) -> Optional[str]:
+        """Get the local go2rtc HLS URL for a camera."""
+        if serial not in self._streams:
+            return None
+        return f"{self._go2rtc_url}/api/stream.m3u8?src=ezviz_{serial}"
+
     def get_rtsp_url(self, serial: str) -> Optional[str]:
         """Get the RTSP URL for a camera."""
         return self._streams.get(serial)
@@ -0,0 +1,233 @@
+"""Live stream health sampling for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import time
+from datetime import timezone
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DEFAULT_HEALTH_PUBLISH_INTERVAL
+from .hls import HlsPlaylist, async_fetch_playlist, is_hls_url
+from .models import CameraState
+
+_LOGGER = logging.getLogger(__name__)
+
+JITTER_GAIN = 1 / 16  # Lissage de la gigue (estimateur RFC 3550)
+BITRATE_GAIN = 0.25  # Lissage du débit
+DEFAULT_POLL_INTERVAL = 2.0  # Cadence sans EXT-X-TARGETDURATION
+MIN_POLL_INTERVAL = 1.0
+MAX_ERROR_BACKOFF = 30.0
+FETCH_TIMEOUT = 5
+
+
+class StreamHealth:
+    """Smoothed health metrics of one live playlist."""
+
+    __slots__ = (
+        "jitter",
+        "bitrate",
+        "live_lag",
+        "url_ttl",
+        "samples",
+        "errors",
+        "last_sequence",
+        "last_arrival",
+        "media_url",
+        "source_url",
+    )
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.jitter: Optional[float] = None  # Secondes
+        self.bitrate: Optional[float] = None  # Bits par seconde
+        self.live_lag: Optional[float] = None  # Secondes
+        self.url_ttl: Optional[int] = None  # Secondes avant expiration de l'URL
+        self.samples = 0
+        self.errors = 0
+        self.last_sequence: Optional[int] = None
+        self.last_arrival: Optional[float] = None
+        self.media_url: Optional[str] = None
+        self.source_url: Optional[str] = None
+
+    def reset_timeline(self):
+        """Forget the segment timeline (new URL or sequence reset)."""
+        self.last_sequence = None
+        self.last_arrival = None
+
+
+class StreamHealthMonitor:
+    """Poll the media playlist of active cameras and publish throttled health metrics."""
+
+    def __init__(self, hass: HomeAssistant, publish_interval: float = DEFAULT_HEALTH_PUBLISH_INTERVAL):
+        """Initialize stream health monitor."""
+        self.hass = hass
+        self.publish_interval = publish_interval
+        self.health: Dict[str, StreamHealth] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._published_at: Dict[str, float] = {}
+        self._listeners: Dict[str, List[CALLBACK_TYPE]] = {}
+
+    def get(self, key: str) -> Optional[StreamHealth]:
+        """Return the metrics of a camera."""
+        return self.health.get(key)
+
+    @callback
+    def async_add_listener(self, key: str, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for the throttled metric updates of one camera."""
+        listeners = self._listeners.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the health listener."""
+            listeners.remove(update_callback)
+            if not listeners:
+                self._listeners.pop(key, None)
+
+        return remove_listener
+
+    def track(self, camera: CameraState):
+        """Start sampling a camera unless already running."""
+        task = self._tasks.get(camera.key)
+        if task is not None and not task.done():
+            return
+        self.health.setdefault(camera.key, StreamHealth())
+        self._tasks[camera.key] = self.hass.async_create_background_task(
+            self._async_run(camera), f"ezviz_enhanced_health_{camera.key}"
+        )
+
+    async def async_untrack(self, key: str):
+        """Stop sampling a camera and drop its metrics."""
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.health.pop(key, None) is not None:
+            self._publish(key)
+        self._published_at.pop(key, None)
+
+    async def async_stop(self):
+        """Stop every sampler."""
+        for key in list(self._tasks):
+            await self.async_untrack(key)
+
+    async def _async_run(self, camera: CameraState):
+        """Sampling loop of one camera, paced by the playlist target duration."""
+        session = async_get_clientsession(self.hass)
+        health = self.health[camera.key]
+        backoff = DEFAULT_POLL_INTERVAL
+        while camera.enabled and is_hls_url(camera.hls_url):
+            try:
+                playlist = await self._async_fetch_media(session, health, camera.hls_url)
+                await self._async_sample(session, health, camera, playlist)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, UnicodeDecodeError) as e:
+                # URL expirée ou caméra en difficulté : le renouvellement changera hls_url
+                health.errors += 1
+                health.media_url = None
+                _LOGGER.debug(f"EZVIZ Enhanced: Échantillon de santé échoué pour {camera.key}: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_ERROR_BACKOFF)
+                continue
+
+            backoff = DEFAULT_POLL_INTERVAL
+            self._maybe_publish(camera.key)
+            await asyncio.sleep(max(playlist.target_duration or DEFAULT_POLL_INTERVAL, MIN_POLL_INTERVAL))
+        self._tasks.pop(camera.key, None)
+
+    async def _async_fetch_media(
+        self, session: aiohttp.ClientSession, health: StreamHealth, url: str
+    ) -> HlsPlaylist:
+        """Fetch the media playlist, resolving a master playlist only once per URL."""
+        if url != health.source_url:
+            health.source_url = url
+            health.media_url = None
+            health.reset_timeline()
+        if health.media_url:
+            return await async_fetch_playlist(session, health.media_url, FETCH_TIMEOUT)
+
+        playlist = await async_fetch_playlist(session, url, FETCH_TIMEOUT)
+        if playlist.is_master:
+            health.media_url = playlist.variants[0]
+            return await async_fetch_playlist(session, health.media_url, FETCH_TIMEOUT)
+        health.media_url = url
+        return playlist
+
+    async def _async_sample(
+        self, session: aiohttp.ClientSession, health: StreamHealth, camera: CameraState, playlist: HlsPlaylist
+    ):
+        """Update the metrics from one playlist snapshot."""
+        now = time.monotonic()
+        health.samples += 1
+        health.url_ttl = max(0, int(camera.expires_at - time.time())) if camera.expires_at else None
+
+        newest = playlist.newest_segment
+        if newest is None:
+            return
+        if health.last_sequence is not None and newest.sequence < health.last_sequence:
+            # Séquence repartie de zéro (flux relancé côté cloud)
+            health.reset_timeline()
+
+        new_segments = [
+            segment for segment in playlist.segments
+            if health.last_sequence is None or segment.sequence > health.last_sequence
+        ]
+        if new_segments:
+            if health.last_sequence is not None and health.last_arrival is not None:
+                # Écart entre l'arrivée observée et la durée annoncée des nouveaux segments
+                expected = sum(segment.duration for segment in new_segments)
+                deviation = abs((now - health.last_arrival) - expected)
+                if health.jitter is None:
+                    health.jitter = deviation
+                else:
+                    health.jitter += (deviation - health.jitter) * JITTER_GAIN
+                await self._async_sample_bitrate(session, health, newest)
+            health.last_sequence = newest.sequence
+            health.last_arrival = now
+
+        if newest.program_date_time is not None:
+            program_date_time = newest.program_date_time
+            if program_date_time.tzinfo is None:
+                program_date_time = program_date_time.replace(tzinfo=timezone.utc)
+            health.live_lag = max(0.0, time.time() - program_date_time.timestamp() - newest.duration)
+        elif health.last_arrival is not None:
+            # Sans EXT-X-PROGRAM-DATE-TIME : âge du segment le plus récent
+            health.live_lag = now - health.last_arrival
+
+    async def _async_sample_bitrate(self, session: aiohttp.ClientSession, health: StreamHealth, segment):
+        """Estimate the bitrate from the size of the newest segment, without downloading it."""
+        if not segment.duration:
+            return
+        try:
+            async with session.head(
+                segment.url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+            ) as response:
+                if response.status != 200 or response.content_length is None:
+                    return
+                bitrate = response.content_length * 8 / segment.duration
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return
+        if health.bitrate is None:
+            health.bitrate = bitrate
+        else:
+            health.bitrate += (bitrate - health.bitrate) * BITRATE_GAIN
+
+    def _maybe_publish(self, key: str):
+        """Notify listeners at most once per publish interval."""
+        now = time.monotonic()
+        published_at = self._published_at.get(key)
+        if published_at is not None and now - published_at < self.publish_interval:
+            return
+        self._published_at[key] = now
+        self._publish(key)
+
+    def _publish(self, key: str):
+        """Notify the listeners of a camera."""
+        for update_callback in list(self._listeners.get(key, [])):
+            update_callback()
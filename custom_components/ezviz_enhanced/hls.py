@@ -0,0 +1,148 @@
+"""HLS playlist helpers for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HlsSegment:
+    """A media segment listed in a playlist."""
+
+    __slots__ = ("url", "duration", "sequence", "program_date_time")
+
+    def __init__(self, url: str, duration: float, sequence: int, program_date_time: Optional[datetime]):
+        """Initialize segment."""
+        self.url = url
+        self.duration = duration
+        self.sequence = sequence
+        self.program_date_time = program_date_time
+
+
+class HlsPlaylist:
+    """A parsed master or media playlist."""
+
+    def __init__(self, url: str):
+        """Initialize playlist."""
+        self.url = url
+        self.variants: List[str] = []
+        self.segments: List[HlsSegment] = []
+        self.target_duration: Optional[float] = None
+        self.media_sequence = 0
+        self.ended = False
+
+    @property
+    def is_master(self) -> bool:
+        """Return true for a master playlist."""
+        return bool(self.variants)
+
+    @property
+    def newest_segment(self) -> Optional[HlsSegment]:
+        """Return the segment closest to the live edge."""
+        return self.segments[-1] if self.segments else None
+
+
+def parse_playlist(text: str, url: str) -> HlsPlaylist:
+    """Parse an M3U8 playlist, resolving URIs against its URL."""
+    playlist = HlsPlaylist(url)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("#EXTM3U"):
+        raise ValueError("Playlist M3U8 invalide")
+
+    expect_variant = False
+    duration = None
+    program_date_time = None
+    sequence = None
+
+    for line in lines[1:]:
+        if line.startswith("#EXT-X-STREAM-INF"):
+            expect_variant = True
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            playlist.target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            playlist.media_sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-PROGRAM-DATE-TIME:"):
+            try:
+                program_date_time = datetime.fromisoformat(line.split(":", 1)[1].replace("Z", "+00:00"))
+            except ValueError:
+                program_date_time = None
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0])
+        elif line.startswith("#EXT-X-ENDLIST"):
+            playlist.ended = True
+        elif not line.startswith("#"):
+            absolute = urljoin(url, line)
+            if expect_variant:
+                playlist.variants.append(absolute)
+                expect_variant = False
+            elif duration is not None:
+                sequence = playlist.media_sequence if sequence is None else sequence + 1
+                playlist.segments.append(HlsSegment(absolute, duration, sequence, program_date_time))
+                duration = None
+                program_date_time = None
+
+    return playlist
+
+
+def is_hls_url(url: Optional[str]) -> bool:
+    """Return true if the URL points to an HLS playlist."""
+    return bool(url) and url.startswith("http") and ".m3u8" in url
+
+
+async def async_fetch_playlist(
+    session: aiohttp.ClientSession, url: str, timeout: float = 5
+) -> HlsPlaylist:
+    """Fetch and parse a playlist."""
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        text = await response.text()
+        # Suivre les redirections éventuelles pour résoudre les URI relatives
+        return parse_playlist(text, str(response.url))
+
+
+async def async_fetch_media_playlist(
+    session: aiohttp.ClientSession, url: str, timeout: float = 5
+) -> HlsPlaylist:
+    """Fetch a media playlist, following the first variant of a master playlist."""
+    playlist = await async_fetch_playlist(session, url, timeout)
+    if playlist.is_master:
+        playlist = await async_fetch_playlist(session, playlist.variants[0], timeout)
+    return playlist
+
+
+async def async_validate_playlist(
+    session: aiohttp.ClientSession, url: str, timeout: float = 3
+) -> Optional[str]:
+    """Check that a playlist answers and lists a reachable segment, return the failure reason or None."""
+    try:
+        playlist = await async_fetch_media_playlist(session, url, timeout)
+    except aiohttp.ClientResponseError as e:
+        return f"playlist HTTP {e.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+        return f"playlist injoignable ({type(e).__name__})"
+    except ValueError:
+        # Réponse 200 qui n'est pas une playlist (erreur JSON, page HTML de blocage...)
+        return "réponse non M3U8"
+
+    segment = playlist.newest_segment
+    if segment is None:
+        return "playlist sans segment"
+
+    # Premier paquet TS seulement : vérifier que le segment existe sans le télécharger
+    try:
+        async with session.get(
+            segment.url,
+            headers={"Range": "bytes=0-187"},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status not in (200, 206):
+                return f"segment HTTP {response.status}"
+            if not await response.content.read(1):
+                return "segment vide"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return f"segment injoignable ({type(e).__name__})"
+    return None
@@ -0,0 +1,117 @@
+"""Cached device inventory for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .const import DEFAULT_INVENTORY_TTL, DEFAULT_INVENTORY_PAGE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Champs suivis pour détecter un appareil modifié
+TRACKED_FIELDS = ("deviceName", "status", "defence", "isEncrypt", "deviceVersion", "channelNumber")
+
+
+class InventoryDiff:
+    """Devices added, removed or changed between two inventory snapshots."""
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self):
+        """Initialize an empty diff."""
+        self.added: Dict[str, Dict[str, Any]] = {}
+        self.removed: Dict[str, Dict[str, Any]] = {}
+        self.changed: Dict[str, Dict[str, Any]] = {}
+
+    def __bool__(self) -> bool:
+        """Return true if anything changed."""
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        """Return a short description of the diff."""
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+
+class DeviceInventory:
+    """Paged device/list with a TTL cache and incremental diffing."""
+
+    def __init__(self, ezviz_open_api, ttl: float = DEFAULT_INVENTORY_TTL, page_size: int = DEFAULT_INVENTORY_PAGE_SIZE):
+        """Initialize device inventory."""
+        self.ezviz_open_api = ezviz_open_api
+        self.ttl = ttl
+        self.page_size = page_size
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self.fetched_at: float = 0
+        self._lock = asyncio.Lock()
+
+    def get_online(self, serial: str) -> Optional[bool]:
+        """Return the online state reported by the platform, None if unknown."""
+        device = self.devices.get(serial)
+        if device is None or "status" not in device:
+            return None
+        return str(device["status"]) == "1"
+
+    async def async_iter_devices(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every device, fetching the pages after the first one concurrently."""
+        devices, total = await self.ezviz_open_api.async_get_device_page(0, self.page_size)
+        if devices is None:
+            raise ConnectionError("device/list sans réponse")
+        for device in devices:
+            yield device
+
+        pages = math.ceil(total / self.page_size) if total else 1
+        if pages <= 1:
+            return
+
+        results = await asyncio.gather(
+            *(self.ezviz_open_api.async_get_device_page(page, self.page_size) for page in range(1, pages))
+        )
+        for devices, _total in results:
+            if devices is None:
+                # Une page manquante fausserait le diff (appareils « supprimés »)
+                raise ConnectionError("Page device/list manquante")
+            for device in devices:
+                yield device
+
+    async def async_refresh(self, force: bool = False) -> InventoryDiff:
+        """Refresh the inventory if stale and return what changed."""
+        async with self._lock:
+            if not force and self.fetched_at and time.monotonic() - self.fetched_at < self.ttl:
+                return InventoryDiff()
+
+            try:
+                snapshot = {
+                    device["deviceSerial"]: device
+                    async for device in self.async_iter_devices()
+                    if device.get("deviceSerial")
+                }
+            except ConnectionError as e:
+                # Garder l'inventaire précédent, réessayer au prochain cycle
+                _LOGGER.debug(f"EZVIZ Enhanced: Inventaire non rafraîchi: {e}")
+                return InventoryDiff()
+
+            diff = self._diff(snapshot)
+            self.devices = snapshot
+            self.fetched_at = time.monotonic()
+            if diff:
+                _LOGGER.debug(f"EZVIZ Enhanced: Inventaire mis à jour ({diff})")
+            return diff
+
+    def _diff(self, snapshot: Dict[str, Dict[str, Any]]) -> InventoryDiff:
+        """Compare a new snapshot with the current inventory."""
+        diff = InventoryDiff()
+        for serial, device in snapshot.items():
+            previous = self.devices.get(serial)
+            if previous is None:
+                diff.added[serial] = device
+            elif any(previous.get(field) != device.get(field) for field in TRACKED_FIELDS):
+                diff.changed[serial] = device
+        for serial, device in self.devices.items():
+            if serial not in snapshot:
+                diff.removed[serial] = device
+        return diff
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Return the inventory as a device list."""
+        return list(self.devices.values())
@@ -0,0 +1,86 @@
+"""App key pool for EZVIZ Enhanced integration."""
+import bisect
+import hashlib
+import logging
+from typing import List, Tuple
+
+from .api import EzvizOpenApi
+
+_LOGGER = logging.getLogger(__name__)
+
+RING_REPLICAS = 100  # Points virtuels par clé sur l'anneau
+
+
+def parse_app_keys(value: str) -> List[Tuple[str, str]]:
+    """Parse 'key:secret' pairs separated by commas or new lines."""
+    pairs = []
+    for item in value.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        app_key, _, app_secret = item.partition(":")
+        if not app_key.strip() or not app_secret.strip():
+            _LOGGER.warning("⚠️ EZVIZ Enhanced: Paire de clés ignorée (format attendu clé:secret)")
+            continue
+        pairs.append((app_key.strip(), app_secret.strip()))
+    return pairs
+
+
+def _hash(value: str) -> int:
+    """Return a stable position on the ring."""
+    return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+
+class AppKeyPool:
+    """Assign cameras to app keys by consistent hashing, with spillover when a key is throttled."""
+
+    def __init__(self, clients: List[EzvizOpenApi]):
+        """Initialize app key pool."""
+        self.clients = clients
+        self._ring: List[Tuple[int, int]] = sorted(
+            (_hash(f"{client.app_key}#{replica}"), index)
+            for index, client in enumerate(clients)
+            for replica in range(RING_REPLICAS)
+        )
+        self._positions = [position for position, _index in self._ring]
+        self.spillovers = 0
+
+    def _candidates(self, serial: str) -> List[EzvizOpenApi]:
+        """Return the clients in ring order starting from the owner of a serial."""
+        start = bisect.bisect(self._positions, _hash(serial)) % len(self._ring)
+        order: List[int] = []
+        for offset in range(len(self._ring)):
+            index = self._ring[(start + offset) % len(self._ring)][1]
+            if index not in order:
+                order.append(index)
+                if len(order) == len(self.clients):
+                    break
+        return [self.clients[index] for index in order]
+
+    def owner(self, serial: str) -> EzvizOpenApi:
+        """Return the client a serial is hashed to."""
+        return self._candidates(serial)[0]
+
+    def client_for(self, serial: str) -> EzvizOpenApi:
+        """Return the client to use now for a serial."""
+        candidates = self._candidates(serial)
+        for client in candidates:
+            if not client.is_throttled:
+                if client is not candidates[0]:
+                    # Clé propriétaire limitée : déborder vers la suivante sur l'anneau
+                    self.spillovers += 1
+                    _LOGGER.debug(f"EZVIZ Enhanced: {serial} servi par la clé {client.app_key[:6]}… (débordement)")
+                return client
+        # Toutes les clés sont limitées : rester sur la clé propriétaire
+        return candidates[0]
+
+    def client_for_account(self) -> EzvizOpenApi:
+        """Return the client to use now for an account-wide call (not tied to a camera)."""
+        # Pas de propriétaire sur l'anneau : la clé non limitée qui a le plus de quota restant
+        usable = [client for client in self.clients if not client.is_throttled] or self.clients
+        return max(usable, key=lambda client: client.rate_limiter.headroom)
+
+    @property
+    def headroom(self) -> int:
+        """Return the quota left across all keys."""
+        return sum(client.rate_limiter.headroom for client in self.clients)
@@ -0,0 +1,118 @@
+"""Data models for EZVIZ Enhanced integration."""
+from typing import Any, Dict, Optional
+
+# Drapeaux compacts de l'état d'une caméra
+FLAG_ENABLED = 0x01
+FLAG_ONLINE = 0x02
+FLAG_CONVERTED = 0x04  # stream_url pointe vers une conversion RTSP locale
+
+
+def camera_key(serial: str, channel: int = 1) -> str:
+    """Return the local key of a camera channel (the serial for channel 1)."""
+    return serial if channel == 1 else f"{serial}_{channel}"
+
+
+class CameraState:
+    """Single shared record describing one camera channel."""
+
+    __slots__ = (
+        "key",
+        "serial",
+        "channel",
+        "name",
+        "device_type",
+        "flags",
+        "stream_type",
+        "protocol",
+        "quality",
+        "stream_url",
+        "hls_url",
+        "flv_url",
+        "cloud_url",
+        "rtsp_local_url",
+        "ieuopen_url",
+        "expires_at",
+        "version",
+    )
+
+    def __init__(
+        self,
+        serial: str,
+        channel: int = 1,
+        name: Optional[str] = None,
+        enabled: bool = True,
+        device_type: str = "camera",
+    ):
+        """Initialize camera state."""
+        self.key = camera_key(serial, channel)
+        self.serial = serial
+        self.channel = channel
+        self.name = name or f"EZVIZ {serial}"
+        self.device_type = device_type
+        self.flags = FLAG_ENABLED if enabled else 0
+        self.stream_type: Optional[str] = None
+        self.protocol: Optional[str] = None
+        self.quality: Optional[str] = None
+        self.stream_url: Optional[str] = None
+        self.hls_url: Optional[str] = None
+        self.flv_url: Optional[str] = None
+        self.cloud_url: Optional[str] = None
+        self.rtsp_local_url: Optional[str] = None
+        self.ieuopen_url: Optional[str] = None
+        self.expires_at = 0  # Timestamp d'expiration de l'URL (0 = inconnu)
+        self.version = 0
+
+    def _set_flag(self, flag: int, value: bool):
+        """Set or clear a flag."""
+        if value:
+            self.flags |= flag
+        else:
+            self.flags &= ~flag
+
+    @property
+    def enabled(self) -> bool:
+        """Return true if the camera is enabled."""
+        return bool(self.flags & FLAG_ENABLED)
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._set_flag(FLAG_ENABLED, value)
+
+    @property
+    def online(self) -> bool:
+        """Return true if the last negotiation returned a stream."""
+        return bool(self.flags & FLAG_ONLINE)
+
+    @online.setter
+    def online(self, value: bool):
+        self._set_flag(FLAG_ONLINE, value)
+
+    @property
+    def converted(self) -> bool:
+        """Return true if stream_url is a local RTSP conversion."""
+        return bool(self.flags & FLAG_CONVERTED)
+
+    @converted.setter
+    def converted(self, value: bool):
+        self._set_flag(FLAG_CONVERTED, value)
+
+    def apply_stream_info(self, stream_info: Dict[str, Any]):
+        """Update the record from an async_get_stream_info result."""
+        self.online = stream_info.get("status") == "online"
+        self.stream_type = stream_info.get("stream_type")
+        self.protocol = stream_info.get("protocol")
+        self.quality = stream_info.get("quality")
+        self.hls_url = stream_info.get("hls_url")
+        self.flv_url = stream_info.get("flv_url")
+        self.cloud_url = stream_info.get("cloud_url")
+
+    def fingerprint(self) -> int:
+        """Return a hash of every field except the version counter."""
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__[:-1]))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record as a dictionary (diagnostics, services)."""
+        data = {slot: getattr(self, slot) for slot in self.__slots__ if slot != "flags"}
+        data["enabled"] = self.enabled
+        data["status"] = "online" if self.online else "offline"
+        return data
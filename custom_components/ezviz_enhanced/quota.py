@@ -0,0 +1,59 @@
+"""Daily quota persistence for EZVIZ Enhanced integration."""
+import logging
+from datetime import date
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import EzvizOpenApi
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}_quota"  # Un fichier par clé : {STORAGE_KEY}_{clé d'application}
+
+SAVE_DELAY = 30  # Écriture groupée du compteur (secondes)
+
+
+class QuotaStore:
+    """Keep the calls made today by one client in HA storage, so a restart does not reset the quota guard."""
+
+    def __init__(self, hass: HomeAssistant, client: EzvizOpenApi):
+        """Initialize quota store."""
+        self.rate_limiter = client.rate_limiter
+        self._store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}_{client.app_key}")
+        self._save_pending = False
+
+    async def async_load(self):
+        """Restore today's counter and start saving it."""
+        data = await self._store.async_load() or {}
+        try:
+            self.rate_limiter.restore(date.fromisoformat(data["day"]), int(data["used"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+        else:
+            _LOGGER.debug(
+                f"EZVIZ Enhanced: {self.rate_limiter.used_today} appels déjà passés aujourd'hui "
+                f"pour la clé {self._store.key}"
+            )
+        self.rate_limiter.on_consume = self._async_schedule_save
+
+    async def async_save(self):
+        """Write the counter now and stop saving it."""
+        self.rate_limiter.on_consume = None
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_schedule_save(self):
+        """Schedule one delayed write (not pushed back by every call)."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the day and the calls made on it."""
+        self._save_pending = False
+        return {"day": self.rate_limiter.day.isoformat(), "used": self.rate_limiter.used_today}
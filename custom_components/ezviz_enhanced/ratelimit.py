@@ -0,0 +1,197 @@
+"""Client-side rate limiting for the EZVIZ Open Platform API."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Classes de priorité : les demandes interactives passent avant les renouvellements
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Part du quota journalier réservée aux demandes interactives
+INTERACTIVE_RESERVE = 0.05
+
+
+class QuotaExceeded(Exception):
+    """Raised when the daily quota left for background requests is exhausted."""
+
+
+class TokenBucket:
+    """Classic token bucket."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill."""
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Return how long until a token is available (0 if one is)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Take one token (wait_time must have returned 0)."""
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Token buckets per app key and per endpoint with priority queueing and a daily quota."""
+
+    def __init__(
+        self,
+        rate: float = 5,
+        capacity: float = 10,
+        endpoint_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        daily_quota: int = 10000,
+    ):
+        """Initialize rate limiter."""
+        self._global = TokenBucket(rate, capacity)
+        self._endpoint_limits = endpoint_limits or {}
+        self._endpoints: Dict[str, TokenBucket] = {}
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.daily_quota = daily_quota
+        self.used_today = 0
+        self.throttled = 0
+        self._day = date.today()
+        # Demandes déjà comptées comme limitées (numéro de séquence)
+        self._blocked: Set[int] = set()
+        # Appelé à chaque appel décompté du quota (persistance)
+        self.on_consume: Optional[Callable[[], None]] = None
+
+    @property
+    def day(self) -> date:
+        """Return the day used_today refers to."""
+        return self._day
+
+    def restore(self, day: date, used: int):
+        """Restore the calls already made today (persisted before a restart)."""
+        self._roll_day()
+        if day == self._day:
+            self.used_today = max(self.used_today, used)
+
+    @property
+    def headroom(self) -> int:
+        """Return the number of calls left in today's quota."""
+        self._roll_day()
+        return max(self.daily_quota - self.used_today, 0)
+
+    def _roll_day(self):
+        """Reset the daily counter at midnight."""
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+
+    def _bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        """Return the bucket of an endpoint, if it has a specific limit."""
+        if endpoint not in self._endpoint_limits:
+            return None
+        bucket = self._endpoints.get(endpoint)
+        if bucket is None:
+            bucket = TokenBucket(*self._endpoint_limits[endpoint])
+            self._endpoints[endpoint] = bucket
+        return bucket
+
+    async def async_acquire(self, endpoint: str, priority: int = PRIORITY_BACKGROUND):
+        """Wait for permission to call an endpoint."""
+        if priority != PRIORITY_INTERACTIVE and self.headroom <= self.daily_quota * INTERACTIVE_RESERVE:
+            raise QuotaExceeded(f"Quota journalier EZVIZ presque épuisé ({self.used_today}/{self.daily_quota})")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), endpoint, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        self._consumed()
+
+    def try_acquire(self, endpoint: str, priority: int = PRIORITY_BACKGROUND) -> bool:
+        """Take a token only if one is available right now and nobody is queued."""
+        if priority != PRIORITY_INTERACTIVE and self.headroom <= self.daily_quota * INTERACTIVE_RESERVE:
+            return False
+        if any(not future.done() for *_rest, future in self._waiters):
+            return False
+        now = time.monotonic()
+        bucket = self._bucket(endpoint)
+        if self._global.wait_time(now) > 0 or (bucket and bucket.wait_time(now) > 0):
+            return False
+        self._global.consume()
+        if bucket:
+            bucket.consume()
+        self._consumed()
+        return True
+
+    def _consumed(self):
+        """Count one call against today's quota."""
+        self._roll_day()
+        self.used_today += 1
+        if self.on_consume:
+            self.on_consume()
+
+    def _dispatch(self):
+        """Grant tokens to waiters in priority order."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        next_wakeup = None
+        remaining = []
+
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            _priority, sequence, endpoint, future = waiter
+            if future.done():
+                self._blocked.discard(sequence)
+                continue
+
+            global_wait = self._global.wait_time(now)
+            if global_wait > 0:
+                # Plus de jeton global : personne ne passe, l'ordre de priorité est conservé
+                remaining.append(waiter)
+                next_wakeup = global_wait if next_wakeup is None else min(next_wakeup, global_wait)
+                break
+
+            bucket = self._bucket(endpoint)
+            endpoint_wait = bucket.wait_time(now) if bucket else 0.0
+            if endpoint_wait > 0:
+                # Cet endpoint est saturé, les autres peuvent passer
+                remaining.append(waiter)
+                if sequence not in self._blocked:
+                    # Compté une fois par demande, pas à chaque passage
+                    self._blocked.add(sequence)
+                    self.throttled += 1
+                next_wakeup = endpoint_wait if next_wakeup is None else min(next_wakeup, endpoint_wait)
+                continue
+
+            self._global.consume()
+            if bucket:
+                bucket.consume()
+            self._blocked.discard(sequence)
+            future.set_result(None)
+
+        for waiter in remaining:
+            heapq.heappush(self._waiters, waiter)
+
+        if self._waiters and next_wakeup is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_wakeup, self._dispatch)
@@ -0,0 +1,103 @@
+"""Regional API endpoint selection for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 5
+
+
+class RegionSelector:
+    """Keep the Open Platform base URL with the lowest RTT, with fallback on failure."""
+
+    def __init__(self, default_base: str, reevaluate_interval: float = 21600, failure_cooldown: float = 300):
+        """Initialize region selector."""
+        self.reevaluate_interval = reevaluate_interval
+        self.failure_cooldown = failure_cooldown
+        self.candidates: List[str] = [default_base]
+        self.current = default_base
+        self.rtts: Dict[str, Optional[float]] = {}
+        self._probed_at: float = 0
+        self._failures: Dict[str, float] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def set_area_domain(self, area_domain: Optional[str]):
+        """Add the regional domain named by the token response."""
+        if not area_domain:
+            return
+        area_domain = area_domain.rstrip("/")
+        if not area_domain.startswith("http"):
+            area_domain = f"https://{area_domain}"
+        if area_domain in self.candidates:
+            return
+        # Le domaine régional passe devant la passerelle globale à RTT égal
+        self.candidates.insert(0, area_domain)
+        self._probed_at = 0
+        _LOGGER.info(f"🌍 EZVIZ Enhanced: Domaine régional {area_domain}")
+
+    @property
+    def needs_probe(self) -> bool:
+        """Return true when the candidates should be measured again."""
+        if len(self.candidates) < 2:
+            return False
+        return not self._probed_at or time.monotonic() - self._probed_at > self.reevaluate_interval
+
+    def schedule_probe(self):
+        """Measure the candidates in the background unless already running."""
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        self._probed_at = time.monotonic()
+        self._probe_task = asyncio.create_task(self.async_probe())
+
+    async def async_probe(self):
+        """Measure the RTT of every candidate and keep the fastest."""
+        # Session dédiée sans keep-alive : la session partagée garde déjà une connexion chaude vers
+        # la passerelle globale (token/get), le candidat régional paierait seul TCP + TLS
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(force_close=True)) as session:
+            rtts = await asyncio.gather(*(self._async_rtt(session, base) for base in self.candidates))
+        self.rtts = dict(zip(self.candidates, rtts))
+        reachable = [base for base in self.candidates if self.rtts[base] is not None]
+        if not reachable:
+            return
+        # min() garde l'ordre des candidats en cas d'égalité
+        best = min(reachable, key=lambda base: self.rtts[base])
+        if best != self.current:
+            _LOGGER.info(
+                f"🌍 EZVIZ Enhanced: Endpoint API {best} sélectionné ({self.rtts[best] * 1000:.0f} ms)"
+            )
+        self.current = best
+        self._failures.pop(best, None)
+
+    async def _async_rtt(self, session: aiohttp.ClientSession, base: str) -> Optional[float]:
+        """Return the time to the response headers of a base URL, None if unreachable."""
+        started = time.monotonic()
+        try:
+            async with session.head(base, timeout=aiohttp.ClientTimeout(total=PROBE_TIMEOUT)):
+                # Tout statut HTTP prouve que la passerelle répond
+                return time.monotonic() - started
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.debug(f"EZVIZ Enhanced: Endpoint {base} injoignable: {e}")
+            return None
+
+    def report_failure(self, base: str):
+        """Switch to the next healthy candidate after a transport failure."""
+        now = time.monotonic()
+        self._failures[base] = now
+        if base != self.current:
+            return
+        for candidate in self.candidates:
+            failed_at = self._failures.get(candidate)
+            if failed_at is None or now - failed_at > self.failure_cooldown:
+                if candidate != base:
+                    _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Endpoint {base} en échec, bascule vers {candidate}")
+                self.current = candidate
+                return
+
+    def stop(self):
+        """Cancel a running probe."""
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
@@ -0,0 +1,93 @@
+"""Shared EZVIZ Open Platform clients for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+from typing import Any, Dict, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .api import EzvizOpenApi
+from .const import DATA_CLIENTS
+from .quota import QuotaStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """Reference-counted EzvizOpenApi clients keyed by credentials."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize client registry."""
+        self.hass = hass
+        self._clients: Dict[Tuple[str, str], EzvizOpenApi] = {}
+        self._refcounts: Dict[Tuple[str, str], int] = {}
+        self._quotas: Dict[Tuple[str, str], QuotaStore] = {}
+        self._lock = asyncio.Lock()
+
+    async def async_acquire(self, app_key: str, app_secret: str, **options) -> EzvizOpenApi:
+        """Return the client of these credentials, creating it on first use."""
+        key = (app_key, app_secret)
+        async with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # Token, session, limiteur et quota communs à toutes les entrées de cette clé
+                client = EzvizOpenApi(app_key=app_key, app_secret=app_secret, **options)
+                # Quota du jour repris du stockage : un redémarrage ne le remet pas à zéro
+                quota = QuotaStore(self.hass, client)
+                await quota.async_load()
+                self._quotas[key] = quota
+                self._clients[key] = client
+                self._refcounts[key] = 0
+            else:
+                _LOGGER.debug(f"EZVIZ Enhanced: Client API partagé pour la clé {app_key[:6]}…")
+                self._merge_options(client, options)
+            self._refcounts[key] += 1
+            return client
+
+    def _merge_options(self, client: EzvizOpenApi, options: Dict[str, Any]):
+        """Apply the most conservative settings of every entry sharing a client."""
+        daily_quota = options.get("daily_quota")
+        rate_limiter = client.rate_limiter
+        if daily_quota is not None and daily_quota != rate_limiter.daily_quota:
+            # Le quota est celui de la clé : la valeur la plus basse protège toutes les entrées
+            _LOGGER.warning(
+                f"⚠️ EZVIZ Enhanced: Quotas journaliers différents pour la clé {client.app_key[:6]}… "
+                f"({rate_limiter.daily_quota}/{daily_quota}), {min(rate_limiter.daily_quota, daily_quota)} retenu"
+            )
+            rate_limiter.daily_quota = min(rate_limiter.daily_quota, daily_quota)
+        hedge_requests = options.get("hedge_requests")
+        if hedge_requests is not None and hedge_requests != client.hedge_requests:
+            # Les requêtes dupliquées consomment du quota : désactivées si une entrée les refuse
+            _LOGGER.warning(
+                f"⚠️ EZVIZ Enhanced: Option de requêtes dupliquées différente pour la clé "
+                f"{client.app_key[:6]}…, désactivée"
+            )
+            client.hedge_requests = False
+
+    async def async_release(self, client: EzvizOpenApi):
+        """Drop one reference and close the client when it was the last one."""
+        key = (client.app_key, client.app_secret)
+        async with self._lock:
+            if self._clients.get(key) is not client:
+                return
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return
+            del self._clients[key]
+            del self._refcounts[key]
+            quota = self._quotas.pop(key)
+        await quota.async_save()
+        _LOGGER.debug(f"EZVIZ Enhanced: Fermeture du client API pour la clé {client.app_key[:6]}…")
+        await client.async_close()
+
+    def __len__(self) -> int:
+        """Return the number of live clients."""
+        return len(self._clients)
+
+
+def get_client_registry(hass: HomeAssistant) -> ClientRegistry:
+    """Return the domain-level client registry."""
+    registry = hass.data.get(DATA_CLIENTS)
+    if registry is None:
+        # Clé séparée : hass.data[DOMAIN] ne contient que des coordinateurs
+        registry = hass.data[DATA_CLIENTS] = ClientRegistry(hass)
+    return registry
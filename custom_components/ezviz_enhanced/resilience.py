@@ -0,0 +1,142 @@
+"""Error classification, backoff and circuit breaking for EZVIZ API calls."""
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+ERROR_NONE = "ok"
+ERROR_RETRYABLE = "retryable"
+ERROR_AUTH = "auth"
+ERROR_RATE_LIMIT = "rate_limit"
+ERROR_PERMANENT = "permanent"
+
+# Codes EZVIZ Open Platform
+AUTH_CODES = {"10002"}  # accessToken expiré ou invalide
+RATE_LIMIT_CODES = {"10028", "10029"}  # Quota / fréquence d'appel dépassés
+RETRYABLE_CODES = {"20006", "20008", "49999"}  # Réseau appareil, délai appareil, erreur serveur
+
+MAX_ATTEMPTS = 3
+PROBE_TIMEOUT = 60  # Une requête de test abandonnée libère le demi-ouvert
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when an endpoint is failing fast."""
+
+
+def classify_response(status: int, result: Dict[str, Any]) -> str:
+    """Return the error class of an Open Platform response."""
+    if status == 429:
+        return ERROR_RATE_LIMIT
+    if status >= 500:
+        return ERROR_RETRYABLE
+    if status != 200:
+        return ERROR_PERMANENT
+
+    code = str(result.get("code"))
+    if code == "200":
+        return ERROR_NONE
+    if code in AUTH_CODES:
+        return ERROR_AUTH
+    if code in RATE_LIMIT_CODES:
+        return ERROR_RATE_LIMIT
+    if code in RETRYABLE_CODES:
+        return ERROR_RETRYABLE
+    # Appareil inconnu, paramètre invalide, appareil hors ligne... : réessayer ne sert à rien
+    return ERROR_PERMANENT
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Return an exponential backoff delay with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker (closed, open, half-open)."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 15, max_reset_timeout: float = 300):
+        """Initialize circuit breaker."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float = 0
+        self._probe_started: float = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return true while requests are rejected."""
+        return self.opened_at > 0 and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Return true if a request may be sent."""
+        if self.opened_at == 0:
+            return True
+        now = time.monotonic()
+        if self.is_open or (self._probe_started and now - self._probe_started < PROBE_TIMEOUT):
+            return False
+        # Demi-ouvert : une seule requête de test
+        self._probe_started = now
+        return True
+
+    def release_probe(self):
+        """Free the half-open probe slot after a call that got no API answer (quota, cancellation)."""
+        self._probe_started = 0
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        if self.opened_at:
+            _LOGGER.info(f"✅ EZVIZ Enhanced: API {self.name} de nouveau disponible")
+        self.failures = 0
+        self.opened_at = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._probe_started = 0
+
+    def record_failure(self):
+        """Count a failure and open the circuit past the threshold."""
+        self.failures += 1
+        if self._probe_started:
+            # Le test a échoué : rouvrir plus longtemps
+            self._probe_started = 0
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self.opened_at = time.monotonic()
+        elif self.opened_at == 0 and self.failures >= self.failure_threshold:
+            _LOGGER.warning(
+                f"🚧 EZVIZ Enhanced: API {self.name} en échec ({self.failures} erreurs), "
+                f"appels suspendus {self.reset_timeout:.0f}s"
+            )
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of latency samples per key."""
+
+    def __init__(self, window: int = 200):
+        """Initialize latency tracker."""
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, latency: float):
+        """Add a latency sample (seconds)."""
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def count(self, key: str) -> int:
+        """Return the number of samples of a key."""
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100) of a key, None without samples."""
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
@@ -0,0 +1,242 @@
+"""Per-camera segment buffer and clip export for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from typing import List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Format des noms de segments : l'heure de début est encodée dans le nom
+SEGMENT_NAME_FORMAT = "%Y%m%d-%H%M%S"
+SEGMENT_EXTENSION = ".ts"
+RESTART_DELAY = 5  # Délai avant relance de FFmpeg si le flux tombe
+
+
+class SegmentBuffer:
+    """Rolling buffer of stream-copied MPEG-TS segments for one camera."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        serial: str,
+        base_dir: str,
+        segment_seconds: int = 2,
+        retention_seconds: int = 300,
+    ):
+        """Initialize segment buffer."""
+        self.hass = hass
+        self.serial = serial
+        self.directory = os.path.join(base_dir, serial)
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self._source_url: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Return true if the buffer is recording."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def source_url(self) -> Optional[str]:
+        """Return the URL currently recorded."""
+        return self._source_url
+
+    async def async_start(self, source_url: str):
+        """Start (or restart on URL change) recording the given source."""
+        if self.is_running and source_url == self._source_url:
+            return
+
+        await self.async_stop()
+        self._source_url = source_url
+        await self.hass.async_add_executor_job(self._make_directory)
+        self._task = asyncio.create_task(self._run())
+        _LOGGER.info(f"📼 EZVIZ Enhanced: Buffer de segments démarré pour {self.serial}")
+
+    def _make_directory(self):
+        """Create the segment directory (executor)."""
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def async_stop(self):
+        """Stop recording (segments already written are kept)."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _build_command(self) -> List[str]:
+        """Build the FFmpeg segment muxer command."""
+        return [
+            "ffmpeg",
+            "-loglevel", "error",
+            "-i", self._source_url,
+            "-map", "0",
+            "-c", "copy",  # Pas de ré-encodage
+            "-f", "segment",
+            "-segment_time", str(self.segment_seconds),
+            "-segment_format", "mpegts",
+            "-reset_timestamps", "1",
+            "-strftime", "1",
+            os.path.join(self.directory, f"{SEGMENT_NAME_FORMAT}{SEGMENT_EXTENSION}"),
+        ]
+
+    async def _run(self):
+        """Run FFmpeg and restart it until cancelled."""
+        try:
+            while True:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self._build_command(),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                prune_task = asyncio.create_task(self._prune_loop())
+                try:
+                    _, stderr = await self._process.communicate()
+                finally:
+                    prune_task.cancel()
+                _LOGGER.warning(
+                    f"⚠️ EZVIZ Enhanced: Buffer {self.serial} interrompu "
+                    f"(code {self._process.returncode}): {stderr.decode(errors='ignore')[:200]}"
+                )
+                await asyncio.sleep(RESTART_DELAY)
+        except asyncio.CancelledError:
+            if self._process and self._process.returncode is None:
+                self._process.terminate()
+                await self._process.wait()
+            raise
+        finally:
+            self._process = None
+
+    async def _prune_loop(self):
+        """Periodically delete segments older than the retention window."""
+        while True:
+            await asyncio.sleep(self.segment_seconds * 5)
+            # Parcours du répertoire et suppressions hors de la boucle d'événements
+            await self.hass.async_add_executor_job(self.prune)
+
+    def prune(self):
+        """Delete segments that fell out of the retention window (executor)."""
+        limit = time.time() - self.retention_seconds
+        for start, _end, path in self.list_segments():
+            if start < limit:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def list_segments(self) -> List[Tuple[float, float, str]]:
+        """Return (start, end, path) for every buffered segment, oldest first (executor)."""
+        try:
+            names = sorted(
+                name for name in os.listdir(self.directory)
+                if name.endswith(SEGMENT_EXTENSION)
+            )
+        except FileNotFoundError:
+            return []
+
+        starts = []
+        for name in names:
+            try:
+                start = time.mktime(time.strptime(name[:-len(SEGMENT_EXTENSION)], SEGMENT_NAME_FORMAT))
+            except ValueError:
+                continue
+            starts.append((start, os.path.join(self.directory, name)))
+
+        segments = []
+        for index, (start, path) in enumerate(starts):
+            if index + 1 < len(starts):
+                end = starts[index + 1][0]
+            else:
+                # Segment en cours d'écriture
+                end = time.time()
+            segments.append((start, end, path))
+        return segments
+
+    def get_segments(self, start: float, end: float) -> List[str]:
+        """Return segment paths overlapping the [start, end] range (executor)."""
+        return [
+            path for seg_start, seg_end, path in self.list_segments()
+            if seg_end > start and seg_start < end
+        ]
+
+    def clear(self):
+        """Remove every buffered segment from disk."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ClipExporter:
+    """Export clips from segment buffers through a bounded worker pool."""
+
+    def __init__(self, hass: HomeAssistant, max_workers: int = 2):
+        """Initialize clip exporter."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    async def async_export(
+        self, buffer: SegmentBuffer, start: float, end: float, output_path: str
+    ) -> Optional[str]:
+        """Concatenate buffered segments into an MP4 without re-encoding."""
+        segments = await self.hass.async_add_executor_job(buffer.get_segments, start, end)
+        if not segments:
+            _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Aucun segment disponible pour {buffer.serial} sur cette plage")
+            return None
+
+        async with self._semaphore:
+            list_path = f"{output_path}.txt"
+
+            def write_concat_list():
+                """Write the list read by the FFmpeg concat demuxer."""
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+                with open(list_path, "w", encoding="utf-8") as f:
+                    for path in segments:
+                        escaped = path.replace("'", "'\\''")
+                        f.write(f"file '{escaped}'\n")
+
+            def remove_concat_list():
+                """Remove the concat list once FFmpeg is done."""
+                try:
+                    os.remove(list_path)
+                except OSError:
+                    pass
+
+            await self.hass.async_add_executor_job(write_concat_list)
+
+            cmd = [
+                "ffmpeg",
+                "-loglevel", "error",
+                "-y",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_path,
+                "-c", "copy",
+                "-bsf:a", "aac_adtstoasc",
+                "-movflags", "+faststart",
+                output_path,
+            ]
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+            finally:
+                await self.hass.async_add_executor_job(remove_concat_list)
+
+            if process.returncode != 0:
+                _LOGGER.error(
+                    f"🔴 EZVIZ Enhanced: Échec export clip {buffer.serial}: "
+                    f"{stderr.decode(errors='ignore')[:200]}"
+                )
+                return None
+
+        _LOGGER.info(f"🎬 EZVIZ Enhanced: Clip exporté pour {buffer.serial} ({len(segments)} segments) → {output_path}")
+        return output_path
@@ -7,7 +7,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN, ATTR_QUOTA_USED, ATTR_QUOTA_LIMIT, ATTR_THROTTLED,
+    ATTR_REFRESH_P50, ATTR_REFRESH_P99, ATTR_LIVE_P95, ATTR_HEDGED, ATTR_APP_KEYS, ATTR_SPILLOVERS,
+    ATTR_HEALTH_SAMPLES, ATTR_HEALTH_ERRORS,
+)
 from .coordinator import EzvizDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,9 +28,16 @@ async def async_setup_entry(
     entities = []
     
     # Add sensors for each camera
-    for serial, camera_data in coordinator.cameras.items():
-        if camera_data.get("enabled", True):
-            entities.append(EzvizEnhancedSensor(coordinator, serial, config_entry.entry_id))
+    for serial in coordinator.cameras:
+        entities.append(EzvizEnhancedSensor(coordinator, serial, config_entry.entry_id))
+        if coordinator.health_monitor:
+            for metric in HEALTH_METRICS:
+                entities.append(EzvizStreamHealthSensor(coordinator, serial, config_entry.entry_id, metric))
+
+    # Marge de quota de l'API Open (une par entrée)
+    if coordinator.ezviz_open_api:
+        entities.append(EzvizQuotaSensor(coordinator, config_entry.entry_id))
+        entities.append(EzvizRefreshLatencySensor(coordinator, config_entry.entry_id))
 
     async_add_entities(entities)
 
@@ -34,6 +45,8 @@ async def async_setup_entry(
 class EzvizEnhancedSensor(SensorEntity):
     """Representation of an EZVIZ Enhanced sensor."""
 
+    _attr_should_poll = False
+
     def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, entry_id: str) -> None:
         """Initialize the sensor."""
         self.coordinator = coordinator
@@ -51,8 +64,10 @@ class EzvizEnhancedSensor(SensorEntity):
     @property
     def native_value(self) -> str:
         """Return the state of the sensor."""
-        camera_data = self.coordinator.cameras.get(self.serial, {})
-        return camera_data.get("stream_type", "unknown")
+        camera_state = self.coordinator.cameras.get(self.serial)
+        if camera_state is None or camera_state.stream_type is None:
+            return "unknown"
+        return camera_state.stream_type
 
     @property
     def available(self) -> bool:
@@ -62,9 +77,153 @@ class EzvizEnhancedSensor(SensorEntity):
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_camera_listener(self.serial, self.async_write_ha_state)
         )
 
-    async def async_update(self) -> None:
-        """Update the entity."""
-        await self.coordinator.async_request_refresh()
+
+class EzvizQuotaSensor(SensorEntity):
+    """Remaining daily EZVIZ Open API quota of the entry."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:gauge"
+    _attr_native_unit_of_measurement = "calls"
+
+    def __init__(self, coordinator: EzvizDataUpdateCoordinator, entry_id: str) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self._attr_name = "EZVIZ API Quota Headroom"
+        self._attr_unique_id = f"{DOMAIN}_sensor_quota_headroom_{entry_id[:8]}"
+
+    @property
+    def native_value(self) -> int:
+        """Return the calls left in today's quota."""
+        if self.coordinator.api_pool:
+            return self.coordinator.api_pool.headroom
+        return self.coordinator.ezviz_open_api.rate_limiter.headroom
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return quota usage details."""
+        api_pool = self.coordinator.api_pool
+        clients = api_pool.clients if api_pool else [self.coordinator.ezviz_open_api]
+        attributes = {
+            ATTR_QUOTA_USED: sum(client.rate_limiter.used_today for client in clients),
+            ATTR_QUOTA_LIMIT: sum(client.rate_limiter.daily_quota for client in clients),
+            ATTR_THROTTLED: sum(client.rate_limiter.throttled for client in clients),
+        }
+        if api_pool:
+            attributes[ATTR_APP_KEYS] = len(clients)
+            attributes[ATTR_SPILLOVERS] = api_pool.spillovers
+        return attributes
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        # Mis à jour à chaque cycle du coordinateur, pas à chaque requête
+        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
+
+
+def _ms(seconds: Optional[float]) -> Optional[int]:
+    """Convert a latency in seconds to milliseconds."""
+    return None if seconds is None else round(seconds * 1000)
+
+
+class EzvizRefreshLatencySensor(SensorEntity):
+    """p99 latency of the stream URL renewals of the entry."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:timer-outline"
+    _attr_native_unit_of_measurement = "ms"
+
+    def __init__(self, coordinator: EzvizDataUpdateCoordinator, entry_id: str) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self._attr_name = "EZVIZ Refresh Latency"
+        self._attr_unique_id = f"{DOMAIN}_sensor_refresh_latency_{entry_id[:8]}"
+
+    @property
+    def native_value(self) -> Optional[int]:
+        """Return the p99 renewal latency."""
+        return _ms(self.coordinator.refresh_latency.percentile("refresh", 99))
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return latency details."""
+        ezviz_open_api = self.coordinator.ezviz_open_api
+        return {
+            ATTR_REFRESH_P50: _ms(self.coordinator.refresh_latency.percentile("refresh", 50)),
+            ATTR_REFRESH_P99: self.native_value,
+            ATTR_LIVE_P95: _ms(ezviz_open_api.get_live_latency(95)),
+            ATTR_HEDGED: ezviz_open_api.hedged,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
+
+
+# Métrique : (nom, unité, icône, conversion depuis StreamHealth)
+HEALTH_METRICS = {
+    "jitter": ("Segment Jitter", "ms", "mdi:pulse", lambda health: _ms(health.jitter)),
+    "bitrate": (
+        "Bitrate", "kbit/s", "mdi:speedometer",
+        lambda health: None if health.bitrate is None else round(health.bitrate / 1000),
+    ),
+    "live_lag": (
+        "Live Edge Lag", "s", "mdi:timer-sand",
+        lambda health: None if health.live_lag is None else round(health.live_lag, 1),
+    ),
+    "url_ttl": ("URL Time To Expiry", "s", "mdi:timer-lock-outline", lambda health: health.url_ttl),
+}
+
+
+class EzvizStreamHealthSensor(SensorEntity):
+    """One live stream health metric of a camera, measured on its playlist."""
+
+    _attr_should_poll = False
+
+    def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, entry_id: str, metric: str) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.serial = serial
+        self.entry_id = entry_id
+        self.metric = metric
+        name, unit, icon, self._value = HEALTH_METRICS[metric]
+        self._attr_name = f"EZVIZ {serial} {name}"
+        self._attr_unique_id = f"{DOMAIN}_sensor_{serial}_{metric}_{entry_id[:8]}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_icon = icon
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, serial)},
+            "name": f"EZVIZ Camera {serial}",
+            "manufacturer": "EZVIZ",
+            "model": "Enhanced Camera",
+        }
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the metric value."""
+        health = self.coordinator.health_monitor.get(self.serial)
+        return self._value(health) if health else None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return sampling counters."""
+        health = self.coordinator.health_monitor.get(self.serial)
+        return {
+            ATTR_HEALTH_SAMPLES: health.samples if health else 0,
+            ATTR_HEALTH_ERRORS: health.errors if health else 0,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.health_monitor.get(self.serial) is not None
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        # Le moniteur limite lui-même la fréquence des écritures d'état
+        self.async_on_remove(
+            self.coordinator.health_monitor.async_add_listener(self.serial, self.async_write_ha_state)
+        )
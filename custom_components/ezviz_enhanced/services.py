@@ -0,0 +1,73 @@
+"""Services for EZVIZ Enhanced integration."""
+import logging
+import os
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN, CONF_SERIAL, SERVICE_EXPORT_CLIP
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FILENAME = "filename"
+
+EXPORT_CLIP_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_SERIAL): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+        vol.Required(ATTR_FILENAME): cv.string,
+    }
+)
+
+
+def _find_coordinator(hass: HomeAssistant, serial: str):
+    """Return the coordinator that manages a camera."""
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if serial in getattr(coordinator, "cameras", {}):
+            return coordinator
+    return None
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register EZVIZ Enhanced services."""
+    if hass.services.has_service(DOMAIN, SERVICE_EXPORT_CLIP):
+        return
+
+    async def async_export_clip(call: ServiceCall) -> None:
+        """Export a clip from the segment buffer of a camera."""
+        serial = call.data[CONF_SERIAL]
+        start = dt_util.as_utc(call.data[ATTR_START]).timestamp()
+        end = dt_util.as_utc(call.data[ATTR_END]).timestamp()
+        filename = call.data[ATTR_FILENAME]
+
+        if end <= start:
+            raise HomeAssistantError("La fin du clip doit être postérieure au début")
+
+        if not hass.config.is_allowed_path(os.path.dirname(filename) or filename):
+            raise HomeAssistantError(f"Chemin non autorisé: {filename}")
+
+        coordinator = _find_coordinator(hass, serial)
+        if coordinator is None:
+            raise HomeAssistantError(f"Caméra inconnue: {serial}")
+
+        result = await coordinator.async_export_clip(serial, start, end, filename)
+        if result is None:
+            raise HomeAssistantError(f"Échec de l'export du clip pour {serial}")
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXPORT_CLIP, async_export_clip, schema=EXPORT_CLIP_SCHEMA
+    )
+
+
+async def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove EZVIZ Enhanced services once the last entry is unloaded."""
+    if hass.data.get(DOMAIN):
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT_CLIP)
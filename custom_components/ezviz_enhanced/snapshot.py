@@ -0,0 +1,390 @@
+"""Snapshot helpers for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .hls import async_fetch_media_playlist
+
+_LOGGER = logging.getLogger(__name__)
+
+# Largeurs des variantes redimensionnées (None = pleine résolution)
+SIZE_BUCKETS = (320, 640, 1280)
+
+# Une extraction renvoie les images produites, indexées par taille
+SnapshotFetcher = Callable[[Optional[int]], Awaitable[Optional[Dict[Optional[int], bytes]]]]
+
+
+def size_bucket(width: Optional[int], height: Optional[int]) -> Optional[int]:
+    """Return the smallest size bucket covering the requested dimensions."""
+    if width is None and height is not None:
+        width = height * 16 // 9
+    if width is None:
+        return None
+    for bucket in SIZE_BUCKETS:
+        if width <= bucket:
+            return bucket
+    return None
+
+
+class SnapshotCache:
+    """JPEG LRU cache with TTL, single-flight and stale-while-revalidate."""
+
+    def __init__(self, ttl: float = 30, max_concurrent: int = 2, max_entries: int = 64):
+        """Initialize snapshot cache."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Clé : (serial, taille) -> (horodatage, image)
+        self._entries: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, bytes]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Optional[int]], asyncio.Task] = {}
+        # Limite globale d'extractions simultanées (toutes caméras confondues)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, serial: str, counter: str):
+        """Increment a per-camera counter."""
+        stats = self._stats.setdefault(serial, {"hits": 0, "stale_hits": 0, "misses": 0})
+        stats[counter] += 1
+
+    async def async_get(
+        self, serial: str, fetch: SnapshotFetcher, bucket: Optional[int] = None
+    ) -> Optional[bytes]:
+        """Return a cached image, refreshing it through fetch when needed."""
+        key = (serial, bucket)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry[0] < self.ttl:
+                self._count(serial, "hits")
+                return entry[1]
+
+            # Image périmée : la servir tout de suite et rafraîchir en arrière-plan
+            self._count(serial, "stale_hits")
+            self._ensure_refresh(key, fetch)
+            return entry[1]
+
+        self._count(serial, "misses")
+        return await asyncio.shield(self._ensure_refresh(key, fetch))
+
+    def _ensure_refresh(self, key: Tuple[str, Optional[int]], fetch: SnapshotFetcher) -> asyncio.Task:
+        """Start a refresh unless one is already in flight for this key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, fetch))
+            self._inflight[key] = task
+        return task
+
+    async def _refresh(self, key: Tuple[str, Optional[int]], fetch: SnapshotFetcher) -> Optional[bytes]:
+        """Fetch new images and store every size produced by the extraction."""
+        serial, bucket = key
+        try:
+            async with self._semaphore:
+                images = await fetch(bucket)
+            if not images:
+                return None
+            now = time.monotonic()
+            # Redimensionnement en échec : la pleine résolution sert la taille demandée jusqu'au TTL
+            if bucket not in images and None in images:
+                images[bucket] = images[None]
+            for size, image in images.items():
+                self._store((serial, size), now, image)
+            return images.get(bucket)
+        except Exception as e:
+            _LOGGER.error(f"🔴 EZVIZ Enhanced: Erreur lors du rafraîchissement de la miniature {key}: {e}")
+            return None
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Tuple[str, Optional[int]], timestamp: float, image: bytes):
+        """Store an image and evict the least recently used entries."""
+        self._entries[key] = (timestamp, image)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, serial: str):
+        """Drop every cached image of a camera."""
+        for key in [key for key in self._entries if key[0] == serial]:
+            del self._entries[key]
+
+    def record_latency(self, serial: str, source: str, seconds: float):
+        """Record the extraction latency of a source (moving average)."""
+        latencies = self._latency.setdefault(serial, {})
+        previous = latencies.get(source)
+        latencies[source] = seconds if previous is None else previous * 0.8 + seconds * 0.2
+
+    def get_latency(self, serial: str) -> Dict[str, int]:
+        """Return the average extraction latency per source in milliseconds."""
+        return {source: int(seconds * 1000) for source, seconds in self._latency.get(serial, {}).items()}
+
+    def get_stats(self, serial: str) -> Dict[str, Any]:
+        """Return hit/miss counters of a camera."""
+        return dict(self._stats.get(serial, {"hits": 0, "stale_hits": 0, "misses": 0}))
+
+
+async def async_ffmpeg_snapshot(
+    stream_url: str, bucket: Optional[int] = None, timeout: float = 10
+) -> Optional[Dict[Optional[int], bytes]]:
+    """Extract one JPEG frame with FFmpeg, plus a resized variant in the same pass."""
+    _LOGGER.debug(f"EZVIZ Enhanced: Génération de la miniature avec FFmpeg...")
+    return await _async_run_snapshot(["-i", stream_url], bucket, timeout)
+
+
+async def async_hls_keyframe_snapshot(
+    session: aiohttp.ClientSession,
+    playlist_url: str,
+    bucket: Optional[int] = None,
+    timeout: float = 10,
+) -> Optional[Dict[Optional[int], bytes]]:
+    """Decode one frame from the newest HLS segment, downloading only what is needed."""
+    playlist = await async_fetch_media_playlist(session, playlist_url, timeout / 2)
+    segment = playlist.newest_segment
+    if segment is None:
+        return None
+
+    async def feed(stdin: asyncio.StreamWriter):
+        """Stream the segment into FFmpeg until it has decoded a frame."""
+        async with session.get(segment.url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(16384):
+                stdin.write(chunk)
+                await stdin.drain()
+        stdin.close()
+
+    _LOGGER.debug(f"EZVIZ Enhanced: Miniature depuis le dernier segment HLS ({segment.url[:80]}...)")
+    return await _async_run_snapshot(["-f", "mpegts", "-i", "pipe:0"], bucket, timeout, feed)
+
+
+async def _async_run_snapshot(
+    input_args: List[str],
+    bucket: Optional[int],
+    timeout: float,
+    feed: Optional[Callable[[asyncio.StreamWriter], Awaitable[None]]] = None,
+) -> Optional[Dict[Optional[int], bytes]]:
+    """Run a one-frame FFmpeg extraction, optionally feeding stdin."""
+    ffmpeg_cmd = ["ffmpeg", *input_args]
+
+    read_fd = write_fd = None
+    if bucket is None:
+        ffmpeg_cmd += [
+            "-frames:v", "1",  # Une seule frame
+            "-f", "image2",
+            "-c:v", "mjpeg",
+            "-q:v", "2",  # Qualité (2-31, 2 = meilleure)
+            "pipe:1"
+        ]
+    else:
+        # La variante redimensionnée sort sur un descripteur dédié
+        read_fd, write_fd = os.pipe()
+        ffmpeg_cmd += [
+            "-filter_complex", f"[0:v]split=2[full][small];[small]scale={bucket}:-2[scaled]",
+            "-map", "[full]", "-frames:v", "1", "-f", "image2", "-c:v", "mjpeg", "-q:v", "2", "pipe:1",
+            "-map", "[scaled]", "-frames:v", "1", "-f", "image2", "-c:v", "mjpeg", "-q:v", "4",
+            f"pipe:{write_fd}",
+        ]
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *ffmpeg_cmd,
+            stdin=asyncio.subprocess.PIPE if feed else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=(write_fd,) if write_fd is not None else ()
+        )
+    except Exception:
+        if read_fd is not None:
+            os.close(read_fd)
+        raise
+    finally:
+        if write_fd is not None:
+            os.close(write_fd)
+
+    reader = None
+    if read_fd is not None:
+        reader = asyncio.get_running_loop().run_in_executor(None, _read_fd, read_fd)
+
+    feeder = None
+    if feed:
+        feeder = asyncio.create_task(_async_feed(feed, process.stdin))
+
+    try:
+        # Pas de communicate() : depuis Python 3.12 il ferme stdin, que le feeder alimente encore
+        stdout, stderr, _returncode = await asyncio.wait_for(
+            asyncio.gather(process.stdout.read(), process.stderr.read(), process.wait()),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    finally:
+        # FFmpeg a terminé : inutile de télécharger la suite du segment
+        if feeder is not None:
+            feeder.cancel()
+        scaled = await reader if reader is not None else None
+
+    if process.returncode == 0 and stdout:
+        _LOGGER.debug(f"EZVIZ Enhanced: Miniature générée avec succès ({len(stdout)} bytes)")
+        images = {None: stdout}
+        if scaled:
+            images[bucket] = scaled
+        return images
+
+    _LOGGER.warning(f"EZVIZ Enhanced: Échec FFmpeg: {stderr.decode()[-200:]}")
+    return None
+
+
+async def _async_feed(
+    feed: Callable[[asyncio.StreamWriter], Awaitable[None]], stdin: asyncio.StreamWriter
+):
+    """Run a stdin feeder, ignoring FFmpeg closing its input early."""
+    try:
+        await feed(stdin)
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    except aiohttp.ClientError as e:
+        _LOGGER.debug(f"EZVIZ Enhanced: Téléchargement du segment interrompu: {e}")
+        stdin.close()
+
+
+def _read_fd(fd: int) -> bytes:
+    """Read a pipe until EOF (runs in the executor)."""
+    with os.fdopen(fd, "rb") as pipe:
+        return pipe.read()
+
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+
+class FrameExtractor:
+    """Long-running low-FPS FFmpeg that always holds the latest JPEG frame."""
+
+    def __init__(self, serial: str, fps: float = 0.5, idle_timeout: float = 60):
+        """Initialize frame extractor."""
+        self.serial = serial
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self._source_url: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        self._frame: Optional[bytes] = None
+        self._frame_time = 0.0
+        self._last_demand = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """Return true if the extractor process is running."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def latest_frame(self) -> Optional[bytes]:
+        """Return the latest complete frame, if it is recent enough."""
+        if self._frame is None:
+            return None
+        # Une frame plus vieille que quelques intervalles signale un flux bloqué
+        if time.monotonic() - self._frame_time > max(3 / self.fps, 10):
+            return None
+        return self._frame
+
+    def touch(self):
+        """Record viewer demand so the extractor keeps running."""
+        self._last_demand = time.monotonic()
+
+    async def async_start(self, source_url: str):
+        """Start (or restart on URL change) the extractor."""
+        self.touch()
+        if self.is_running and source_url == self._source_url:
+            return
+
+        await self.async_stop()
+        self._source_url = source_url
+        self._task = asyncio.create_task(self._run())
+        _LOGGER.info(f"🖼️ EZVIZ Enhanced: Extracteur de frames démarré pour {self.serial} ({self.fps} fps)")
+
+    async def async_stop(self):
+        """Stop the extractor."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._buffer.clear()
+        self._scan_pos = 0
+
+    def _build_command(self):
+        """Build the FFmpeg image2pipe command."""
+        return [
+            "ffmpeg",
+            "-loglevel", "error",
+            "-i", self._source_url,
+            "-vf", f"fps={self.fps}",
+            "-f", "image2pipe",
+            "-c:v", "mjpeg",
+            "-q:v", "5",
+            "pipe:1",
+        ]
+
+    async def _run(self):
+        """Read frames from FFmpeg until idle or cancelled."""
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self._build_command(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(self._process.stdout.read(65536), timeout=10)
+                except asyncio.TimeoutError:
+                    chunk = None
+                else:
+                    if not chunk:
+                        _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Extracteur de frames terminé pour {self.serial}")
+                        break
+                    self._feed(chunk)
+
+                if time.monotonic() - self._last_demand > self.idle_timeout:
+                    _LOGGER.info(f"💤 EZVIZ Enhanced: Extracteur de frames arrêté pour {self.serial} (aucun spectateur)")
+                    break
+        finally:
+            if self._process and self._process.returncode is None:
+                self._process.terminate()
+                await self._process.wait()
+            self._process = None
+
+    def _feed(self, data: bytes):
+        """Parse JPEG frame boundaries incrementally."""
+        buffer = self._buffer
+        buffer += data
+
+        while True:
+            start = buffer.find(JPEG_SOI)
+            if start < 0:
+                # Garder le dernier octet au cas où un marqueur serait coupé en deux
+                del buffer[:-1]
+                self._scan_pos = 0
+                return
+            if start > 0:
+                del buffer[:start]
+                self._scan_pos = max(self._scan_pos - start, 0)
+
+            end = buffer.find(JPEG_EOI, max(self._scan_pos, 2))
+            if end < 0:
+                self._scan_pos = max(len(buffer) - 1, 2)
+                return
+
+            self._frame = bytes(buffer[:end + 2])
+            self._frame_time = time.monotonic()
+            del buffer[:end + 2]
+            self._scan_pos = 0
@@ -0,0 +1,187 @@
+"""Latency-based stream source selection for EZVIZ Enhanced integration."""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_GO2RTC_RTSP = "go2rtc_rtsp"
+SOURCE_GO2RTC_HLS = "go2rtc_hls"
+SOURCE_CLOUD_HLS = "cloud_hls"
+SOURCE_CLOUD_FLV = "cloud_flv"
+
+# Ordre utilisé tant qu'aucune mesure n'est disponible (comportement historique)
+DEFAULT_ORDER = (SOURCE_CLOUD_HLS, SOURCE_GO2RTC_RTSP, SOURCE_GO2RTC_HLS, SOURCE_CLOUD_FLV)
+
+MEASURE_TIMEOUT = 8
+
+
+class SourceMeasurement:
+    """Latency measurement of one candidate source."""
+
+    __slots__ = ("source", "ttfb", "ttff")
+
+    def __init__(self, source: str, ttfb: Optional[float], ttff: Optional[float]):
+        """Initialize measurement."""
+        self.source = source
+        self.ttfb = ttfb
+        self.ttff = ttff
+
+    @property
+    def score(self) -> float:
+        """Return the ranking score (lower is better)."""
+        if self.ttff is not None:
+            return self.ttff
+        if self.ttfb is not None:
+            # Pas de frame décodée : pénaliser sans exclure
+            return self.ttfb + MEASURE_TIMEOUT
+        return float("inf")
+
+
+class StreamSourceSelector:
+    """Rank candidate sources per camera by time-to-first-byte and time-to-first-frame."""
+
+    def __init__(self, hass, reevaluate_interval: float = 1800, failure_cooldown: float = 120):
+        """Initialize source selector."""
+        self.hass = hass
+        self.reevaluate_interval = reevaluate_interval
+        self.failure_cooldown = failure_cooldown
+        self._rankings: Dict[str, List[SourceMeasurement]] = {}
+        self._measured_at: Dict[str, float] = {}
+        self._measuring: Dict[str, asyncio.Task] = {}
+        self._failures: Dict[Tuple[str, str], float] = {}
+        self._selected: Dict[str, str] = {}
+
+    def get_selected(self, serial: str) -> Optional[str]:
+        """Return the source type last selected for a camera."""
+        return self._selected.get(serial)
+
+    def select(self, serial: str, candidates: Dict[str, str]) -> Optional[Tuple[str, str]]:
+        """Return (source, url) of the fastest healthy candidate."""
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        measured_at = self._measured_at.get(serial)
+        if measured_at is None or now - measured_at > self.reevaluate_interval:
+            # Mesurer en arrière-plan pour ne pas retarder l'ouverture du flux
+            self._schedule_measure(serial, candidates)
+
+        ranking = self._rankings.get(serial)
+        if ranking:
+            ordered = [m.source for m in sorted(ranking, key=lambda m: m.score) if m.score != float("inf")]
+        else:
+            ordered = list(DEFAULT_ORDER)
+
+        for source in ordered + list(DEFAULT_ORDER):
+            if source not in candidates:
+                continue
+            failed_at = self._failures.get((serial, source))
+            if failed_at is not None and now - failed_at < self.failure_cooldown:
+                continue
+            if self._selected.get(serial) != source:
+                _LOGGER.info(f"🎯 EZVIZ Enhanced: Source {source} sélectionnée pour {serial}")
+            self._selected[serial] = source
+            return source, candidates[source]
+
+        # Toutes les sources ont échoué récemment : revenir à la première disponible
+        source = next(iter(candidates))
+        self._selected[serial] = source
+        return source, candidates[source]
+
+    def report_failure(self, serial: str, source: str, candidates: Optional[Dict[str, str]] = None):
+        """Exclude a failing source for a while and re-rank the camera."""
+        _LOGGER.warning(f"⚠️ EZVIZ Enhanced: Source {source} en échec pour {serial}, nouveau classement")
+        self._failures[(serial, source)] = time.monotonic()
+        self._measured_at.pop(serial, None)
+        if candidates:
+            self._schedule_measure(serial, candidates)
+
+    def _schedule_measure(self, serial: str, candidates: Dict[str, str]):
+        """Start a measurement unless one is already running for the camera."""
+        task = self._measuring.get(serial)
+        if task is not None and not task.done():
+            return
+        self._measured_at[serial] = time.monotonic()
+        self._measuring[serial] = self.hass.async_create_background_task(
+            self._async_measure(serial, dict(candidates)), f"ezviz_enhanced_measure_{serial}"
+        )
+
+    async def _async_measure(self, serial: str, candidates: Dict[str, str]):
+        """Measure every candidate concurrently and store the ranking."""
+        results = await asyncio.gather(
+            *(self._async_measure_source(source, url) for source, url in candidates.items())
+        )
+        self._rankings[serial] = list(results)
+        for measurement in results:
+            if measurement.score != float("inf"):
+                self._failures.pop((serial, measurement.source), None)
+        _LOGGER.debug(
+            f"EZVIZ Enhanced: Classement des sources pour {serial}: "
+            + ", ".join(
+                f"{m.source}={m.ttff if m.ttff is not None else '-'}s/{m.ttfb if m.ttfb is not None else '-'}s"
+                for m in sorted(results, key=lambda m: m.score)
+            )
+        )
+
+    async def _async_measure_source(self, source: str, url: str) -> SourceMeasurement:
+        """Measure time-to-first-byte then time-to-first-frame of a source."""
+        try:
+            if url.startswith("rtsp"):
+                ttfb = await self._async_rtsp_ttfb(url)
+            else:
+                ttfb = await self._async_http_ttfb(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            _LOGGER.debug(f"EZVIZ Enhanced: Source {source} injoignable: {e}")
+            return SourceMeasurement(source, None, None)
+
+        return SourceMeasurement(source, ttfb, await self._async_ttff(url))
+
+    async def _async_http_ttfb(self, url: str) -> float:
+        """Return the time to the first body byte of an HTTP source."""
+        session = async_get_clientsession(self.hass)
+        started = time.monotonic()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=MEASURE_TIMEOUT)) as response:
+            response.raise_for_status()
+            await response.content.readany()
+        return time.monotonic() - started
+
+    async def _async_rtsp_ttfb(self, url: str) -> float:
+        """Return the time to the first byte of an RTSP OPTIONS reply."""
+        parsed = urlparse(url)
+        started = time.monotonic()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parsed.hostname, parsed.port or 554), MEASURE_TIMEOUT
+        )
+        try:
+            writer.write(f"OPTIONS {url} RTSP/1.0\r\nCSeq: 1\r\n\r\n".encode())
+            await writer.drain()
+            if not await asyncio.wait_for(reader.read(1), MEASURE_TIMEOUT):
+                raise OSError("Connexion RTSP fermée")
+            return time.monotonic() - started
+        finally:
+            writer.close()
+
+    async def _async_ttff(self, url: str) -> Optional[float]:
+        """Return the time FFmpeg needs to decode the first frame."""
+        started = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-loglevel", "error", "-i", url, "-frames:v", "1", "-f", "null", "-",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            await asyncio.wait_for(process.wait(), MEASURE_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return None
+        if process.returncode != 0:
+            return None
+        return time.monotonic() - started
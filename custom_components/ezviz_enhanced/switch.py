@@ -24,9 +24,9 @@ async def async_setup_entry(
     entities = []
     
     # Add switches for each camera
-    for serial, camera_data in coordinator.cameras.items():
-        if camera_data.get("enabled", True):
-            entities.append(EzvizEnhancedSwitch(coordinator, serial, config_entry.entry_id))
+    # Toutes les caméras, y compris désactivées (sinon impossible de les rallumer)
+    for serial in coordinator.cameras:
+        entities.append(EzvizEnhancedSwitch(coordinator, serial, config_entry))
 
     async_add_entities(entities)
 
@@ -34,10 +34,14 @@ async def async_setup_entry(
 class EzvizEnhancedSwitch(SwitchEntity):
     """Representation of an EZVIZ Enhanced switch."""
 
-    def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, entry_id: str) -> None:
+    _attr_should_poll = False
+
+    def __init__(self, coordinator: EzvizDataUpdateCoordinator, serial: str, config_entry: ConfigEntry) -> None:
         """Initialize the switch."""
         self.coordinator = coordinator
         self.serial = serial
+        self.config_entry = config_entry
+        entry_id = config_entry.entry_id
         self.entry_id = entry_id
         self._attr_name = f"EZVIZ {serial} Stream"
         self._attr_unique_id = f"{DOMAIN}_switch_{serial}_stream_{entry_id[:8]}"
@@ -51,8 +55,8 @@ class EzvizEnhancedSwitch(SwitchEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the switch is on."""
-        camera_data = self.coordinator.cameras.get(self.serial, {})
-        return camera_data.get("enabled", True)
+        camera_state = self.coordinator.cameras.get(self.serial)
+        return camera_state is None or camera_state.enabled
 
     @property
     def available(self) -> bool:
@@ -61,24 +65,16 @@ class EzvizEnhancedSwitch(SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        # Enable camera stream
-        camera_data = self.coordinator.cameras.get(self.serial, {})
-        camera_data["enabled"] = True
-        await self.coordinator.async_request_refresh()
+        # Le flux est renégocié en arrière-plan
+        await self.coordinator.async_set_camera_enabled(self.config_entry, self.serial, True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        # Disable camera stream
-        camera_data = self.coordinator.cameras.get(self.serial, {})
-        camera_data["enabled"] = False
-        await self.coordinator.async_request_refresh()
+        # Arrête renouvellements, flux go2rtc, conversion, extracteur et buffer
+        await self.coordinator.async_set_camera_enabled(self.config_entry, self.serial, False)
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_camera_listener(self.serial, self.async_write_ha_state)
         )
-
-    async def async_update(self) -> None:
-        """Update the entity."""
-        await self.coordinator.async_request_refresh()
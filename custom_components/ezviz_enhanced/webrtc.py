@@ -0,0 +1,88 @@
+"""WebRTC provider for EZVIZ Enhanced integration."""
+import logging
+from typing import Callable, Optional, Tuple
+
+from homeassistant.components.camera import Camera
+from homeassistant.components.camera.webrtc import (
+    CameraWebRTCProvider,
+    WebRTCAnswer,
+    WebRTCError,
+    WebRTCSendMessage,
+    async_register_webrtc_provider,
+)
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_WEBRTC_PROVIDER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EzvizWebRTCProvider(CameraWebRTCProvider):
+    """Serve WebRTC for EZVIZ cameras whose stream is held by go2rtc."""
+
+    # Fournisseur plutôt qu'implémentation native sur l'entité : HLS reste annoncé au frontend
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize WebRTC provider."""
+        self.hass = hass
+
+    @property
+    def domain(self) -> str:
+        """Return the integration domain of the provider."""
+        return DOMAIN
+
+    def _find_camera(self, stream_source: str) -> Optional[Tuple[object, str]]:
+        """Return the coordinator and key of the camera serving a stream source."""
+        for coordinator in self.hass.data.get(DOMAIN, {}).values():
+            for key, camera in coordinator.cameras.items():
+                # Toutes les sources que le sélecteur peut renvoyer, dont le HLS local go2rtc
+                sources = set(coordinator.get_stream_candidates(key).values())
+                sources.update((camera.stream_url, camera.hls_url, camera.flv_url, camera.rtsp_local_url))
+                if stream_source in sources:
+                    return coordinator, key
+        return None
+
+    @callback
+    def async_is_supported(self, stream_source: str) -> bool:
+        """Return true for EZVIZ cameras restreamed by go2rtc, outside LL-HLS mode."""
+        found = self._find_camera(stream_source)
+        if found is None:
+            return False
+        coordinator, key = found
+        # Mode LL-HLS : ne pas proposer WebRTC, le frontend lit la sortie LL-HLS du worker stream
+        return not coordinator.ll_hls_enabled and coordinator.go2rtc_manager.has_stream(key)
+
+    async def async_handle_async_webrtc_offer(
+        self, camera: Camera, offer_sdp: str, session_id: str, send_message: WebRTCSendMessage
+    ) -> None:
+        """Pass the browser SDP offer to go2rtc and send back its answer."""
+        coordinator = getattr(camera, "coordinator", None)
+        serial = getattr(camera, "serial", None)
+        answer_sdp = None
+        if coordinator is not None and serial is not None:
+            answer_sdp = await coordinator.go2rtc_manager.async_webrtc_offer(serial, offer_sdp)
+        if answer_sdp is None:
+            # HLS reste annoncé : le frontend s'y rabat
+            send_message(WebRTCError("go2rtc_unavailable", f"Flux go2rtc indisponible pour {serial}"))
+            return
+        send_message(WebRTCAnswer(answer_sdp))
+
+    async def async_on_webrtc_candidate(self, session_id: str, candidate) -> None:
+        """Ignore trickled candidates (go2rtc gathers its own, the answer carries them)."""
+
+
+@callback
+def async_setup_webrtc_provider(hass: HomeAssistant):
+    """Register the provider once for all config entries."""
+    if DATA_WEBRTC_PROVIDER not in hass.data:
+        hass.data[DATA_WEBRTC_PROVIDER] = async_register_webrtc_provider(hass, EzvizWebRTCProvider(hass))
+
+
+@callback
+def async_unload_webrtc_provider(hass: HomeAssistant):
+    """Unregister the provider when the last config entry is unloaded."""
+    if hass.data.get(DOMAIN):
+        return
+    remove_provider: Optional[Callable[[], None]] = hass.data.pop(DATA_WEBRTC_PROVIDER, None)
+    if remove_provider:
+        remove_provider()
@@ -0,0 +1,12 @@
+"""Test configuration for EZVIZ Enhanced."""
+import os
+import sys
+import types
+
+# Charger les modules sans le __init__ du package (qui importe Home Assistant)
+PACKAGE_DIR = os.path.join(os.path.dirname(__file__), "..", "custom_components", "ezviz_enhanced")
+
+if "ezviz_enhanced" not in sys.modules:
+    package = types.ModuleType("ezviz_enhanced")
+    package.__path__ = [os.path.abspath(PACKAGE_DIR)]
+    sys.modules["ezviz_enhanced"] = package
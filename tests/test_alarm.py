@@ -0,0 +1,146 @@
+"""Tests for incremental alarm ingestion."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from ezviz_enhanced.alarm import AlarmIngestor  # noqa: E402
+from ezviz_enhanced.api import EzvizOpenApi  # noqa: E402
+from ezviz_enhanced.ratelimit import RateLimiter  # noqa: E402
+from ezviz_enhanced.region import RegionSelector  # noqa: E402
+
+
+class FakeAlarmApi:
+    """Local alarm/list serving a mutable alarm table."""
+
+    def __init__(self):
+        self.alarms = []
+        self.calls = 0
+        self.failing_pages = set()
+
+    def add(self, count: int, first_time: int, prefix: str = "a"):
+        for index in range(count):
+            self.alarms.append({
+                "alarmId": f"{prefix}{len(self.alarms)}",
+                "deviceSerial": f"CAM{index % 20:02d}",
+                "channelNo": 1,
+                "alarmType": 10000,
+                "alarmTime": first_time + index,
+            })
+
+    async def handle(self, request):
+        data = await request.post()
+        self.calls += 1
+        page, size = int(data["pageStart"]), int(data["pageSize"])
+        if page in self.failing_pages:
+            return web.json_response({"code": "10001", "msg": "parameter error"})
+        # Plus récentes d'abord, comme la plateforme
+        window = sorted(
+            (alarm for alarm in self.alarms if int(data["startTime"]) <= alarm["alarmTime"] <= int(data["endTime"])),
+            key=lambda alarm: -alarm["alarmTime"],
+        )
+        return web.json_response({
+            "code": "200",
+            "data": window[page * size:(page + 1) * size],
+            "page": {"total": len(window), "page": page, "size": size},
+        })
+
+
+async def _run(tmp_path, scenario):
+    """Run a scenario with an ingestor polling the fake API through a real client."""
+    api = FakeAlarmApi()
+    app = web.Application()
+    app.router.add_post("/api/lapp/alarm/list", api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    hass = HomeAssistant(str(tmp_path))
+    client = EzvizOpenApi("key", "secret")
+    client.access_token = "token"
+    client.region = RegionSelector(f"http://127.0.0.1:{port}")
+    client.rate_limiter = RateLimiter(1000, 1000)
+    ingestor = AlarmIngestor(hass, lambda: client, "key", interval=30)
+    try:
+        return await scenario(api, ingestor)
+    finally:
+        await client.async_close()
+        await runner.cleanup()
+        await hass.async_stop(force=True)
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+def test_flood_is_read_in_pages(tmp_path):
+    """800 alarms take 16 page calls, 5000 are capped at max_pages."""
+
+    async def scenario(api, ingestor):
+        ingestor.cursor = _now() - 60000
+        api.add(800, _now() - 50000)
+        assert await ingestor.async_poll() == 800
+        assert api.calls == 16
+
+        api.calls = 0
+        api.add(5000, _now() - 10000, prefix="b")
+        assert await ingestor.async_poll() == ingestor.max_pages * ingestor.page_size
+        assert api.calls == ingestor.max_pages
+
+    asyncio.run(_run(tmp_path, scenario))
+
+
+def test_overlap_is_deduplicated(tmp_path):
+    """Alarms read again in the overlap window are not dispatched twice."""
+
+    async def scenario(api, ingestor):
+        received = []
+        ingestor.async_add_listener("CAM00", received.append)
+        ingestor.cursor = _now() - 60000
+        api.add(40, _now() - 20000)
+        assert await ingestor.async_poll() == 40
+        api.add(1, _now() - 1000, prefix="c")
+        assert await ingestor.async_poll() == 1
+        assert ingestor.duplicates == 40
+        assert len(received) == 3
+
+    asyncio.run(_run(tmp_path, scenario))
+
+
+def test_missing_page_keeps_cursor(tmp_path):
+    """A failed page leaves the cursor in place so the window is read again."""
+
+    async def scenario(api, ingestor):
+        cursor = ingestor.cursor = _now() - 60000
+        api.add(120, _now() - 30000)
+        api.failing_pages.add(2)
+        assert await ingestor.async_poll() == 0
+        assert ingestor.cursor == cursor
+
+        api.failing_pages.clear()
+        assert await ingestor.async_poll() == 120
+        assert ingestor.cursor > cursor
+
+    asyncio.run(_run(tmp_path, scenario))
+
+
+def test_late_indexed_alarm_is_ingested(tmp_path):
+    """An alarm indexed after a newer one was read is still picked up."""
+
+    async def scenario(api, ingestor):
+        ingestor.cursor = _now() - 60000
+        api.add(1, _now() - 1000)
+        assert await ingestor.async_poll() == 1
+        # Horodatée 60 s plus tôt mais apparue seulement maintenant dans alarm/list
+        api.add(1, _now() - 60000, prefix="late")
+        assert await ingestor.async_poll() == 1
+        assert ingestor.duplicates == 1
+
+    asyncio.run(_run(tmp_path, scenario))
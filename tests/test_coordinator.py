@@ -0,0 +1,58 @@
+"""Tests for per-camera coordinator notifications."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from ezviz_enhanced.api import EzvizApi  # noqa: E402
+from ezviz_enhanced.binary_sensor import EzvizEnhancedBinarySensor  # noqa: E402
+from ezviz_enhanced.const import CONF_CAMERAS, CONF_USE_IEUOPEN  # noqa: E402
+from ezviz_enhanced.coordinator import EzvizDataUpdateCoordinator  # noqa: E402
+
+SERIALS = ["CAM01", "CAM02", "CAM03"]
+
+
+def test_unchanged_cameras_do_not_write_state(tmp_path):
+    """A coordinator cycle only writes the state of entities whose camera changed."""
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = EzvizDataUpdateCoordinator(
+            hass,
+            EzvizApi("user", "password"),
+            None,
+            {CONF_USE_IEUOPEN: False, CONF_CAMERAS: [{"serial": serial} for serial in SERIALS]},
+        )
+        writes = {serial: 0 for serial in SERIALS}
+        try:
+            for serial in SERIALS:
+                entity = EzvizEnhancedBinarySensor(coordinator, serial, "entry_id")
+                entity.hass = hass
+                entity.entity_id = f"binary_sensor.ezviz_{serial.lower()}_online"
+
+                def count(serial=serial):
+                    writes[serial] += 1
+
+                entity.async_write_ha_state = count
+                await entity.async_added_to_hass()
+
+            # Premier cycle : toutes les entités publient leur état initial
+            await coordinator.async_refresh()
+            assert writes == {serial: 1 for serial in SERIALS}
+
+            # Cycles sans changement : aucune écriture
+            for _ in range(3):
+                await coordinator.async_refresh()
+            assert writes == {serial: 1 for serial in SERIALS}
+
+            # Une seule caméra modifiée : une seule écriture
+            coordinator.cameras["CAM02"].online = True
+            await coordinator.async_refresh()
+            assert writes == {"CAM01": 1, "CAM02": 2, "CAM03": 1}
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+"""Tests for HLS playlist validation."""
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from ezviz_enhanced.hls import async_validate_playlist
+
+PLAYLIST = "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:7\n#EXTINF:2.0,\nseg7.ts\n"
+
+
+async def _validate(routes) -> str:
+    """Serve the routes locally and validate /live.m3u8."""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await async_validate_playlist(session, f"http://127.0.0.1:{port}/live.m3u8")
+    finally:
+        await runner.cleanup()
+
+
+async def _playlist(request):
+    return web.Response(text=PLAYLIST)
+
+
+async def _segment(request):
+    return web.Response(body=b"G" * 188)
+
+
+def test_valid_playlist():
+    """A playlist whose newest segment answers is accepted."""
+    assert asyncio.run(_validate({"/live.m3u8": _playlist, "/seg7.ts": _segment})) is None
+
+
+def test_non_m3u8_body_is_rejected():
+    """A 200 answer carrying a JSON error is rejected instead of raising."""
+    async def json_error(request):
+        return web.json_response({"code": "20007", "msg": "device offline"})
+
+    assert asyncio.run(_validate({"/live.m3u8": json_error})) == "réponse non M3U8"
+
+
+def test_missing_segment_is_rejected():
+    """A playlist whose segment is gone is rejected."""
+    assert asyncio.run(_validate({"/live.m3u8": _playlist})) == "segment HTTP 404"
+
+
+def test_http_error_is_rejected():
+    """An expired URL answering 403 is rejected."""
+    async def forbidden(request):
+        raise web.HTTPForbidden()
+
+    assert asyncio.run(_validate({"/live.m3u8": forbidden})) == "playlist HTTP 403"
@@ -0,0 +1,93 @@
+"""Tests for the app key pool."""
+import asyncio
+from collections import Counter
+
+from aiohttp import web
+
+from ezviz_enhanced.api import EzvizOpenApi
+from ezviz_enhanced.keypool import AppKeyPool
+from ezviz_enhanced.ratelimit import RateLimiter
+from ezviz_enhanced.region import RegionSelector
+
+SERIALS = [f"CAM{i:04d}" for i in range(300)]
+
+
+def _clients(count: int):
+    return [EzvizOpenApi(f"key{i}", "secret") for i in range(count)]
+
+
+def test_three_keys_split_cameras():
+    """Each of 3 keys owns roughly a third of the cameras."""
+    pool = AppKeyPool(_clients(3))
+    owners = Counter(pool.owner(serial).app_key for serial in SERIALS)
+    assert set(owners) == {"key0", "key1", "key2"}
+    assert all(60 <= count <= 140 for count in owners.values())
+
+
+def test_fourth_key_moves_a_quarter():
+    """Adding a 4th key only moves cameras to that key, about a quarter of them."""
+    clients = _clients(4)
+    pool, pool4 = AppKeyPool(clients[:3]), AppKeyPool(clients)
+    moved = [serial for serial in SERIALS if pool.owner(serial) is not pool4.owner(serial)]
+    assert {pool4.owner(serial).app_key for serial in moved} == {"key3"}
+    assert 45 <= len(moved) <= 105
+
+
+async def _serve_with_throttled_key(throttled_key: str, serials):
+    """Fetch stream info for every serial through the pool against a local fake API."""
+    calls = Counter()
+
+    async def live(request):
+        data = await request.post()
+        calls[data["accessToken"]] += 1
+        if data["accessToken"] == throttled_key:
+            return web.json_response({"code": "10029", "msg": "api call limit"})
+        return web.json_response({"code": "200", "data": {"url": "https://cdn.example/live.m3u8", "expireTime": 0}})
+
+    app = web.Application()
+    app.router.add_post("/api/lapp/live/address/get", live)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    clients = _clients(3)
+    for client in clients:
+        client.access_token = client.app_key
+        client.region = RegionSelector(f"http://127.0.0.1:{port}")
+        client.rate_limiter = RateLimiter(1000, 1000)
+    pool = AppKeyPool(clients)
+    served = 0
+    try:
+        for serial in serials:
+            if await pool.client_for(serial).async_get_stream_info(serial):
+                served += 1
+    finally:
+        for client in clients:
+            await client.async_close()
+        await runner.cleanup()
+    return calls, served, pool.spillovers
+
+
+def test_throttled_key_spills_to_next_key():
+    """Once a key answers 10029, its cameras are served by the other keys."""
+    serials = SERIALS[:30]
+    owned = sum(AppKeyPool(_clients(3)).owner(serial).app_key == "key0" for serial in serials)
+    calls, served, spillovers = asyncio.run(_serve_with_throttled_key("key0", serials))
+    # Un seul appel sur la clé limitée, puis débordement pour toutes ses autres caméras
+    assert calls["key0"] == 1
+    assert spillovers == owned - 1
+    assert served == calls["key1"] + calls["key2"] == len(serials) - 1
+
+
+def test_account_call_uses_key_with_most_headroom():
+    """Account-wide calls go to the unthrottled key with the most quota left."""
+    clients = _clients(3)
+    clients[0].rate_limiter.used_today = 10
+    clients[1].rate_limiter.used_today = 500
+    pool = AppKeyPool(clients)
+    assert pool.client_for_account() is clients[2]
+    clients[2]._throttled_until = float("inf")
+    assert pool.client_for_account() is clients[0]
+    assert pool.spillovers == 0
@@ -0,0 +1,81 @@
+"""Tests for the camera state record."""
+import tracemalloc
+
+from ezviz_enhanced.models import CameraState
+
+CAMERAS = 1000
+
+
+def _stream(index: int):
+    """Return the URLs and stream info negotiated for one synthetic camera."""
+    serial = f"CAM{index:06d}"
+    hls_url = f"https://open.ezvizlife.com/v3/openlive/{serial}_1_2.m3u8?expire=1760000000&id=abcdef{index}"
+    rtsp_url = f"rtsp://127.0.0.1:8554/ezviz_{serial}"
+    ieuopen_url = f"https://open.ezvizlife.com/console/jssdk/ezopen.html?url=ezopen://open.ezviz.com/{serial}/1.live"
+    stream_info = {
+        "serial": serial,
+        "channel": 1,
+        "status": "online",
+        "stream_type": "hls_fluent",
+        "hls_url": hls_url,
+        "flv_url": None,
+        "rtsp_url": None,
+        "cloud_url": hls_url,
+        "expire_time": 1760000000,
+        "protocol": "2",
+        "quality": "2",
+    }
+    return serial, hls_url, rtsp_url, ieuopen_url, stream_info
+
+
+def _dict_layout(streams):
+    """Build the previous layout: a free-form dict per camera plus parallel dicts."""
+    cameras, stream_urls, rtsp_urls, url_expiration = {}, {}, {}, {}
+    for serial, hls_url, rtsp_url, ieuopen_url, stream_info in streams:
+        camera_data = {"serial": serial, "channel": 1, "name": serial, "enabled": True, "device_type": "camera"}
+        camera_data.update(stream_info)
+        camera_data["stream_url"] = hls_url
+        camera_data["rtsp_local_url"] = rtsp_url
+        camera_data["ieuopen_url"] = ieuopen_url
+        cameras[serial] = camera_data
+        stream_urls[serial] = hls_url
+        rtsp_urls[serial] = rtsp_url
+        url_expiration[serial] = 1760000000
+    return cameras, stream_urls, rtsp_urls, url_expiration
+
+
+def _record_layout(streams):
+    """Build the CameraState layout."""
+    cameras = {}
+    for serial, hls_url, rtsp_url, ieuopen_url, stream_info in streams:
+        camera = CameraState(serial, 1, serial)
+        camera.apply_stream_info(stream_info)
+        camera.stream_url = hls_url
+        camera.rtsp_local_url = rtsp_url
+        camera.ieuopen_url = ieuopen_url
+        camera.expires_at = 1760000000
+        cameras[serial] = camera
+    return cameras
+
+
+def _allocated(build, streams) -> int:
+    """Return the memory held by a layout, the URL strings themselves excluded."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        layout = build(streams)
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del layout
+    return allocated
+
+
+def test_camera_state_is_smaller_than_dict_layout(capsys):
+    """1,000 CameraState records take well under the dict + parallel dicts layout."""
+    streams = [_stream(index) for index in range(CAMERAS)]
+    old = _allocated(_dict_layout, streams)
+    new = _allocated(_record_layout, streams)
+    with capsys.disabled():
+        print(f"\n{CAMERAS} caméras : dicts {old / 1024:.0f} KiB, CameraState {new / 1024:.0f} KiB")
+    assert new < old * 0.6
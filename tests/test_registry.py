@@ -0,0 +1,32 @@
+"""Tests for the shared client registry."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from ezviz_enhanced.registry import ClientRegistry  # noqa: E402
+
+
+def test_shared_key_keeps_most_conservative_options(tmp_path):
+    """Entries sharing a key get the lowest daily quota and hedging only if all of them allow it."""
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        registry = ClientRegistry(hass)
+        try:
+            first = await registry.async_acquire("key", "secret", daily_quota=10000, hedge_requests=True)
+            second = await registry.async_acquire("key", "secret", daily_quota=2000, hedge_requests=False)
+            third = await registry.async_acquire("key", "secret", daily_quota=5000, hedge_requests=True)
+            assert first is second is third
+            assert first.rate_limiter.daily_quota == 2000
+            assert first.hedge_requests is False
+            for client in (first, second, third):
+                await registry.async_release(client)
+            assert len(registry) == 0
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(scenario())
@@ -0,0 +1,73 @@
+"""Tests for the circuit breaker half-open probe."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from ezviz_enhanced.api import EzvizOpenApi, _endpoint
+from ezviz_enhanced.const import EZVIZ_OPEN_LIVE_URL
+from ezviz_enhanced.ratelimit import QuotaExceeded, RateLimiter
+from ezviz_enhanced.region import RegionSelector
+from ezviz_enhanced.resilience import CircuitBreaker
+
+ENDPOINT = _endpoint(EZVIZ_OPEN_LIVE_URL)
+
+
+def _half_open(client: EzvizOpenApi) -> CircuitBreaker:
+    """Install a breaker whose reset timeout has elapsed, the next call being its probe."""
+    breaker = client._breakers[ENDPOINT] = CircuitBreaker(ENDPOINT, reset_timeout=1)
+    breaker.opened_at = time.monotonic() - 2
+    return breaker
+
+
+def test_probe_released_on_quota_exceeded():
+    """A probe refused by the quota guard does not keep the circuit closed to other calls."""
+
+    async def scenario():
+        client = EzvizOpenApi("key", "secret", daily_quota=10)
+        client.rate_limiter.used_today = 10
+        breaker = _half_open(client)
+        with pytest.raises(QuotaExceeded):
+            await client._async_post(EZVIZ_OPEN_LIVE_URL, {"accessToken": "token"})
+        return breaker.allow()
+
+    assert asyncio.run(scenario())
+
+
+def test_probe_released_on_cancellation():
+    """A cancelled probe frees the half-open slot."""
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(request):
+            await release.wait()
+            return web.json_response({"code": "200"})
+
+        app = web.Application()
+        app.router.add_post(ENDPOINT, slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        client = EzvizOpenApi("key", "secret")
+        client.region = RegionSelector(f"http://127.0.0.1:{port}")
+        client.rate_limiter = RateLimiter(1000, 1000)
+        breaker = _half_open(client)
+        try:
+            probe = asyncio.create_task(client._async_post(EZVIZ_OPEN_LIVE_URL, {"accessToken": "token"}))
+            await asyncio.sleep(0.2)
+            assert not breaker.allow()
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            return breaker.allow()
+        finally:
+            release.set()
+            await client.async_close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,57 @@
+"""Tests for the HLS keyframe snapshot."""
+import asyncio
+import os
+import shutil
+import subprocess
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from ezviz_enhanced.snapshot import async_hls_keyframe_snapshot
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg requis")
+
+
+def _make_hls_fixture(directory: str, size: str = "640x360") -> str:
+    """Encode a short test pattern as an HLS playlist with MPEG-TS segments."""
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", f"testsrc=size={size}:rate=10",
+            "-t", "4", "-c:v", "mpeg2video", "-g", "10", "-f", "hls", "-hls_time", "2",
+            "-hls_list_size", "0", os.path.join(directory, "live.m3u8"),
+        ],
+        check=True,
+    )
+    return directory
+
+
+async def _snapshot(directory: str, bucket=None):
+    """Serve the fixture locally and take a snapshot from it."""
+    app = web.Application()
+    app.router.add_static("/", directory)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await async_hls_keyframe_snapshot(session, f"http://127.0.0.1:{port}/live.m3u8", bucket)
+    finally:
+        await runner.cleanup()
+
+
+def test_keyframe_snapshot_from_hls_fixture(tmp_path):
+    """A JPEG is decoded from the newest segment of a local playlist."""
+    images = asyncio.run(_snapshot(_make_hls_fixture(str(tmp_path))))
+    assert images is not None
+    assert images[None].startswith(b"\xff\xd8")
+
+
+def test_keyframe_snapshot_scaled_variant(tmp_path):
+    """The resized variant is produced in the same FFmpeg run."""
+    images = asyncio.run(_snapshot(_make_hls_fixture(str(tmp_path)), 320))
+    assert images is not None
+    assert images[320].startswith(b"\xff\xd8")
+    assert len(images[320]) < len(images[None])
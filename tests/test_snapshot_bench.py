@@ -0,0 +1,92 @@
+"""Benchmarks of snapshot bytes, requests and extraction time."""
+import asyncio
+import os
+import shutil
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from ezviz_enhanced.snapshot import SIZE_BUCKETS, async_ffmpeg_snapshot, async_hls_keyframe_snapshot
+
+from test_snapshot import _make_hls_fixture, _snapshot
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg requis")
+
+ROUNDS = 3
+
+
+def test_bytes_and_encode_time_per_bucket(tmp_path, capsys):
+    """Smaller tiles get smaller JPEGs, at the cost of one scale in the same FFmpeg run."""
+    directory = _make_hls_fixture(str(tmp_path), "1920x1080")
+    results = {}
+    for bucket in (None, *SIZE_BUCKETS):
+        timings = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            images = asyncio.run(_snapshot(directory, bucket))
+            timings.append(time.perf_counter() - started)
+        assert images is not None and bucket in images
+        results[bucket] = (len(images[bucket]), min(timings))
+
+    with capsys.disabled():
+        for bucket, (size, seconds) in results.items():
+            print(f"\n{bucket or 'full':>5}: {size / 1024:7.1f} KiB, {seconds * 1000:6.0f} ms")
+
+    sizes = [results[bucket][0] for bucket in SIZE_BUCKETS]
+    assert sizes == sorted(sizes)
+    assert results[SIZE_BUCKETS[0]][0] < results[None][0] / 4
+
+
+async def _serve_counted(directory: str, take):
+    """Serve the fixture in small chunks, counting requests and bytes actually sent."""
+    sent = {"requests": 0, "bytes": 0}
+
+    async def handle(request):
+        sent["requests"] += 1
+        path = os.path.join(directory, request.match_info["name"])
+        response = web.StreamResponse()
+        await response.prepare(request)
+        with open(path, "rb") as source:
+            while chunk := source.read(16384):
+                await response.write(chunk)
+                sent["bytes"] += len(chunk)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        started = time.perf_counter()
+        images = await take(f"http://127.0.0.1:{port}/live.m3u8")
+        return images, time.perf_counter() - started, sent
+    finally:
+        await runner.cleanup()
+
+
+async def _newest_segment(url: str):
+    async with aiohttp.ClientSession() as session:
+        return await async_hls_keyframe_snapshot(session, url)
+
+
+def test_newest_segment_against_full_playlist(tmp_path, capsys):
+    """The newest-segment path fetches less than FFmpeg opening the playlist itself."""
+    directory = _make_hls_fixture(str(tmp_path), "1920x1080")
+    segment, seconds, sent = asyncio.run(_serve_counted(directory, _newest_segment))
+    playlist, playlist_seconds, playlist_sent = asyncio.run(_serve_counted(directory, async_ffmpeg_snapshot))
+    assert segment is not None and playlist is not None
+
+    with capsys.disabled():
+        print(
+            f"\nsegment:  {sent['requests']} req, {sent['bytes'] / 1024:7.1f} KiB, {seconds * 1000:5.0f} ms"
+            f"\nplaylist: {playlist_sent['requests']} req, {playlist_sent['bytes'] / 1024:7.1f} KiB, "
+            f"{playlist_seconds * 1000:5.0f} ms"
+        )
+
+    assert sent["bytes"] < playlist_sent["bytes"]
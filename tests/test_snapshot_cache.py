@@ -0,0 +1,25 @@
+"""Tests for the snapshot cache."""
+import asyncio
+
+from ezviz_enhanced.snapshot import SnapshotCache
+
+
+def test_failed_resize_is_cached_under_requested_size():
+    """A full-size fallback serves the requested size until the TTL, without a new extraction."""
+    calls = []
+
+    async def fetch(bucket):
+        calls.append(bucket)
+        # Redimensionnement en échec : seule la pleine résolution est produite
+        return {None: b"full"}
+
+    async def scenario():
+        cache = SnapshotCache(ttl=30)
+        first = await cache.async_get("CAM", fetch, 320)
+        second = await cache.async_get("CAM", fetch, 320)
+        return first, second, cache.get_stats("CAM")
+
+    first, second, stats = asyncio.run(scenario())
+    assert first == second == b"full"
+    assert calls == [320]
+    assert stats["hits"] == 1